@@ -0,0 +1,198 @@
+"""
+Fallback chain that supplies credentials and a region (from the environment
+and from the shared AWS credentials and config files) for URIs that do not
+specify them.
+"""
+from __future__ import annotations
+import os
+import time
+from threading import Lock
+from typing import Callable, Mapping, Optional
+
+from .b3u import _CREDENTIALS
+
+
+def _stamp(path: str) -> Optional[tuple]:
+    """
+    Return the modification time and size of a file (or ``None`` if it does
+    not exist), which together determine whether a cached copy is current.
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return (status.st_mtime_ns, status.st_size)
+
+
+def _credentials(values: Mapping) -> dict:
+    """
+    Return the credentials within a mapping (as a unit, and only if both an
+    access key identifier and a secret access key are present).
+    """
+    if not values.get('aws_access_key_id') or not values.get('aws_secret_access_key'):
+        return {}
+    return {key: values[key] for key in _CREDENTIALS if values.get(key)}
+
+
+class credential_chain:
+    """
+    Resolver of the credentials and region for a profile in the manner of
+    Boto3: credentials are taken from the environment variables
+    ``AWS_ACCESS_KEY_ID``, ``AWS_SECRET_ACCESS_KEY`` and ``AWS_SESSION_TOKEN``
+    if they are set and otherwise from the shared credentials file (or, failing
+    that, the config file), and the region is taken from ``AWS_REGION`` or
+    ``AWS_DEFAULT_REGION`` or otherwise from the config file. The profile and
+    file locations can be set using ``AWS_PROFILE``, ``AWS_SHARED_CREDENTIALS_FILE``
+    and ``AWS_CONFIG_FILE``. Instances of this class are typically created via
+    :obj:`b3u.enable_fallback`.
+
+    Each file is parsed only when it is first needed and again whenever its
+    modification time (or size) changes. Values resolved from the files are
+    cached, except that values that include a session token are read from
+    the files again once ``ttl`` seconds have elapsed.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile('w', suffix='.ini', delete=False) as file:
+    ...     _ = file.write('[default]\\naws_access_key_id = abc\\naws_secret_access_key = xyz\\n')
+    >>> chain = credential_chain(environ={'AWS_SHARED_CREDENTIALS_FILE': file.name, 'AWS_REGION': 'us-east-1'})
+    >>> chain.resolve()
+    {'aws_access_key_id': 'abc', 'aws_secret_access_key': 'xyz', 'region_name': 'us-east-1'}
+    >>> os.remove(file.name)
+
+    :param profile: Name of the profile (by default, ``AWS_PROFILE`` or ``default``)
+    :param environ: Mapping of environment variables (by default, ``os.environ``)
+    :param credentials_file: Path of the shared credentials file
+    :param config_file: Path of the config file
+    :param ttl: Number of seconds for which values that include a session
+        token are cached
+    :param clock: Function that returns the current time in seconds
+    """
+
+    def __init__(
+            self,
+            profile: Optional[str] = None,
+            environ: Optional[Mapping] = None,
+            credentials_file: Optional[str] = None,
+            config_file: Optional[str] = None,
+            ttl: float = 900.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.profile = profile
+        self.environ = os.environ if environ is None else environ
+        self.credentials_file = credentials_file
+        self.config_file = config_file
+        self.ttl = ttl
+        self.clock = clock
+        self.reads = 0
+        self._files = {}
+        self._resolved = {}
+        self._lock = Lock()
+
+    def _paths(self) -> tuple:
+        environ = self.environ
+        return (
+            os.path.expanduser(
+                self.credentials_file or environ.get('AWS_SHARED_CREDENTIALS_FILE') or '~/.aws/credentials'
+            ),
+            os.path.expanduser(self.config_file or environ.get('AWS_CONFIG_FILE') or '~/.aws/config')
+        )
+
+    def _sections(self, path: str, stamp: Optional[tuple], force: bool = False) -> dict:
+        # Must be invoked while holding the lock.
+        if stamp is None:
+            return {}
+
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == stamp and not force:
+            return cached[1]
+
+        from configparser import RawConfigParser  # pylint: disable=import-outside-toplevel
+        parser = RawConfigParser(default_section='')
+        with open(path, encoding='utf-8') as file:
+            parser.read_file(file)
+        sections = {name: dict(parser.items(name)) for name in parser.sections()}
+        self.reads += 1
+
+        self._files[path] = (stamp, sections)
+        return sections
+
+    def _profile(self, profile: str) -> dict:
+        """
+        Resolve the credentials and region for a profile from the files.
+        """
+        paths = self._paths()
+        stamps = tuple(map(_stamp, paths))
+        now = self.clock()
+
+        with self._lock:
+            cached = self._resolved.get((profile,) + paths)
+            expired = cached is not None and 'aws_session_token' in cached[2] and now - cached[1] >= self.ttl
+            if cached is not None and cached[0] == stamps and not expired:
+                return cached[2]
+
+            # Expired session tokens are read again even if the files appear
+            # unchanged (as a rewrite may not alter the modification time).
+            credentials = self._sections(paths[0], stamps[0], expired).get(profile, {})
+            config = self._sections(paths[1], stamps[1], expired).get(
+                profile if profile == 'default' else 'profile ' + profile, {}
+            )
+
+            values = _credentials(credentials) or _credentials(config)
+            if config.get('region'):
+                values['region_name'] = config['region']
+
+            self._resolved[(profile,) + paths] = (stamps, now, values)
+            return values
+
+    def resolve(self) -> dict:
+        """
+        Return the credentials (``aws_access_key_id``, ``aws_secret_access_key``
+        and, if available, ``aws_session_token``) and the ``region_name`` that
+        apply in the absence of any others (omitting those that are not found).
+        """
+        environ = self.environ
+        values = dict(self._profile(self.profile or environ.get('AWS_PROFILE') or 'default'))
+
+        credentials = _credentials({
+            'aws_access_key_id': environ.get('AWS_ACCESS_KEY_ID'),
+            'aws_secret_access_key': environ.get('AWS_SECRET_ACCESS_KEY'),
+            'aws_session_token': environ.get('AWS_SESSION_TOKEN')
+        })
+        if len(credentials) > 0:
+            for key in _CREDENTIALS:
+                values.pop(key, None)
+            values.update(credentials)
+
+        region = environ.get('AWS_REGION') or environ.get('AWS_DEFAULT_REGION')
+        if region:
+            values['region_name'] = region
+
+        return values
+
+    def merge(self, result: dict, region: bool = True) -> dict:
+        """
+        Add the resolved credentials to a dictionary of parameters if it has
+        none (credentials are never combined from different sources) and,
+        if ``region`` is true, add the resolved region if it has none.
+        """
+        credentials = all(key not in result for key in _CREDENTIALS)
+        region = region and 'region_name' not in result
+        if not credentials and not region:
+            return result
+
+        values = self.resolve()
+        if credentials:
+            for key in _CREDENTIALS:
+                if key in values:
+                    result[key] = values[key]
+        if region and 'region_name' in values:
+            result['region_name'] = values['region_name']
+        return result
+
+    def clear(self):
+        """
+        Discard all cached files and resolved values.
+        """
+        with self._lock:
+            self._files.clear()
+            self._resolved.clear()
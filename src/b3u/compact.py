@@ -0,0 +1,150 @@
+"""
+Compact (and optionally immutable) representation of a parsed AWS resource
+URI for applications that must hold very many of them in memory.
+"""
+from __future__ import annotations
+from sys import intern
+from types import MappingProxyType
+
+from .b3u import b3u, _FIELDS, _STANDARD
+
+_UNIQUE = frozenset(['Key', 'Name'])
+
+# Shared by all instances that have no custom parameters.
+_NO_CUSTOM_VALUES = MappingProxyType({})
+
+
+class compact:
+    """
+    Parsed URI that stores the standard properties of :obj:`b3u` in fixed
+    slots and any custom parameters in a single mapping, rather than in a
+    per-instance attribute dictionary. It supports the same extraction and
+    formatting methods as :obj:`b3u`.
+
+    >>> c = compact('s3://abc:xyz@bucket/object.data?region_name=us-east-1&other_param=other_value')
+    >>> c.for_get()
+    {'Bucket': 'bucket', 'Key': 'object.data'}
+    >>> c.other_param
+    'other_value'
+    >>> c.region_name = 'us-east-2'
+    >>> c.to_string()
+    's3://abc:xyz@bucket/object.data?region_name=us-east-2&other_param=other_value'
+
+    If ``frozen`` is true, the instance cannot be modified.
+
+    >>> c = compact('s3://abc:xyz@bucket/object.data', frozen=True)
+    >>> c.Key = 'other.data'
+    Traceback (most recent call last):
+      ...
+    AttributeError: cannot modify a frozen compact instance
+    """
+    __slots__ = _FIELDS + ('custom', '_frozen', '_string')
+
+    def __init__(self, uri: str, frozen: bool = False):
+        metrics = b3u._metrics
+        start = 0 if metrics is None else metrics.clock()
+
+        cache = b3u._cache
+        record = b3u._record(uri) if cache is None else cache.get(uri, b3u._record)
+        self._initialize(record[:-1], record[-1], frozen)
+
+        if metrics is not None:
+            metrics.record('construct_compact', record[0], start)
+
+    def _initialize(self, fields: tuple, custom: tuple, frozen: bool):
+        # Values other than the resource names tend to repeat across many
+        # instances, so a single copy of each is shared by way of interning.
+        setter = object.__setattr__
+        if len(custom) > 0 and not _STANDARD.isdisjoint(name for (name, _) in custom):
+            # Custom parameters replace the standard attributes with the
+            # same names (as in the constructor of :obj:`b3u`).
+            replaced = dict(custom)
+            fields = tuple(replaced.get(field, value) for (field, value) in zip(_FIELDS, fields))
+        for (field, value) in zip(_FIELDS, fields):
+            if type(value) is str and field not in _UNIQUE:  # pylint: disable=unidiomatic-typecheck
+                value = intern(value)
+            setter(self, field, value)
+
+        if len(custom) == 0:
+            custom = _NO_CUSTOM_VALUES if frozen else {}
+        else:
+            custom = MappingProxyType(dict(custom)) if frozen else dict(custom)
+
+        setter(self, 'custom', custom)
+        setter(self, '_frozen', frozen)
+        setter(self, '_string', None)
+
+    def __reduce__(self):
+        """
+        Pickle an instance as a tuple of its attribute values.
+
+        >>> import pickle
+        >>> c = compact('s3://abc:xyz@bucket/object.data?tier=cold', frozen=True)
+        >>> pickle.loads(pickle.dumps(c)).to_string()
+        's3://abc:xyz@bucket/object.data?tier=cold'
+        """
+        return (_restore, self._state() + (self._frozen,))
+
+    def __getattr__(self, name: str):
+        # Only invoked for names that are not slots (*i.e.*, custom values).
+        try:
+            return object.__getattribute__(self, 'custom')[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value):
+        if self._frozen:
+            raise AttributeError('cannot modify a frozen compact instance')
+        if name in compact.__slots__:
+            object.__setattr__(self, name, value)
+        elif name in self.custom:
+            self.custom[name] = value
+        else:
+            raise AttributeError(name)
+
+    def _retain(self, string: str):
+        # The custom parameters of a mutable instance can be modified in
+        # place (through custom), so only frozen instances cache their output.
+        if self._frozen:
+            object.__setattr__(self, '_string', string)
+
+    @property
+    def custom_values(self):
+        """
+        Names of the custom parameters (as in :obj:`b3u`).
+        """
+        return self.custom.keys()
+
+    def _get_custom_values(self) -> dict:
+        values = dict(self.custom)
+        for name in _STANDARD.intersection(values):
+            # The standard attribute holds the current value.
+            values[name] = getattr(self, name)
+        return values
+
+    # The extraction and formatting methods only read attributes, so those
+    # of :obj:`b3u` are shared rather than duplicated.
+    _package_properties = b3u._package_properties
+    _package_resources = b3u._package_resources
+    _package_configuration = b3u._package_configuration
+    _state = b3u._state
+    _location = b3u._location
+    _serialize = b3u._serialize
+    credentials = b3u.credentials
+    configuration = b3u.configuration
+    for_client = b3u.for_client
+    for_resource = b3u.for_resource
+    for_get = b3u.for_get
+    cred = b3u.cred
+    conf = b3u.conf
+    to_string = b3u.to_string
+
+
+def _restore(fields: tuple, custom: tuple, frozen: bool) -> compact:
+    """
+    Create a :obj:`compact` instance from the values of its standard
+    attributes and ``(name, value)`` pairs for its custom values.
+    """
+    instance = object.__new__(compact)
+    instance._initialize(fields, custom, frozen)  # pylint: disable=protected-access
+    return instance
@@ -0,0 +1,150 @@
+"""
+Asynchronous pipeline that retrieves the AWS resources (such as S3 objects
+and SSM parameters) identified by many URIs concurrently.
+"""
+from __future__ import annotations
+import asyncio
+import inspect
+from functools import partial
+from typing import AsyncIterator, Callable, Iterable, Optional, Union
+
+from .b3u import b3u, _SERVICES
+
+
+def _methods() -> dict:
+    """
+    Return the client method that retrieves the resource identified by a
+    URI, for each registered service (see :obj:`b3u.register`).
+    """
+    return {scheme: service[2] for (scheme, service) in _SERVICES.items() if service[2] is not None}
+
+
+async def _inputs(uris) -> AsyncIterator:
+    if hasattr(uris, '__aiter__'):
+        async for uri in uris:
+            yield uri
+    else:
+        for uri in uris:
+            yield uri
+
+
+async def fetch(
+        uris: Union[Iterable, AsyncIterator],
+        concurrency: int = 16,
+        clients: Optional[Callable[[dict], object]] = None,
+        retry: Optional[Callable[[object, Exception, int], Optional[float]]] = None,
+        return_exceptions: bool = False,
+        methods: Optional[dict] = None,
+        executor=None
+) -> AsyncIterator[tuple]:
+    """
+    Retrieve the resources identified by URIs (supplied as strings or
+    :obj:`b3u` instances by an iterable or an asynchronous iterable), with at
+    most ``concurrency`` requests in progress at once, yielding a tuple
+    ``(uri, response)`` for each request in the order in which the requests
+    complete. URIs are drawn from the input only when there is capacity
+    for another request, so a slow consumer slows down the pipeline.
+
+    The client for each URI is obtained by supplying the result of
+    :obj:`b3u.for_client` to ``clients`` (by default, the ``get`` method of
+    a :obj:`b3u.pool.client_pool`), which is awaited if it is a coroutine
+    function and is otherwise invoked in ``executor`` (unless the default
+    pool already holds the client). The request is made by supplying
+    the result of :obj:`b3u.for_get` to the client method registered for the
+    service (*e.g.*, ``get_object`` for S3). Methods that are coroutine functions are
+    awaited; all others are invoked in ``executor`` (the default executor
+    of the event loop if it is ``None``).
+
+    >>> class stub:
+    ...     def get_object(self, **ps):
+    ...         return ps['Key'].upper()
+    >>> async def main():
+    ...     return [r async for r in fetch(['s3://bucket/a', 's3://bucket/b'], clients=lambda ps: stub())]
+    >>> sorted(asyncio.run(main()))
+    [('s3://bucket/a', 'A'), ('s3://bucket/b', 'B')]
+
+    :param uris: URIs of the resources to retrieve
+    :param concurrency: Maximum number of requests in progress at once
+    :param clients: Function (or coroutine function) that returns a client
+        given client parameters
+    :param retry: Function that is invoked as ``retry(uri, exception, attempt)``
+        when a request fails and that returns the number of seconds to wait
+        before retrying (or ``None`` if the request should not be retried)
+    :param return_exceptions: If true, the exception raised by a request that
+        ultimately fails is yielded in place of its response (otherwise it
+        is raised and the pipeline stops)
+    :param methods: Mapping from service names to client method names that
+        overrides the registered methods
+    :param executor: Executor in which synchronous client methods (and
+        ``clients``) are invoked
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be a positive integer')
+
+    pooled = None
+    if clients is None:
+        from .pool import client_pool  # pylint: disable=import-outside-toplevel
+        pool = client_pool()
+        (clients, pooled) = (pool.get, pool.lookup)
+    methods = _methods() if methods is None else {**_methods(), **methods}
+    loop = asyncio.get_running_loop()
+
+    async def client(parameters):
+        # Creating a client (and waiting for another task to finish creating
+        # it) can block, so only a client already in the pool is obtained on
+        # the event loop.
+        if inspect.iscoroutinefunction(clients):
+            return await clients(parameters)
+        found = None if pooled is None else pooled(parameters)
+        if found is not None:
+            return found
+        return await loop.run_in_executor(executor, clients, parameters)
+
+    async def request(uri):
+        parsed = b3u(uri) if isinstance(uri, str) else uri
+        if parsed.service_name not in methods:
+            raise ValueError('service is not supported: ' + str(parsed.service_name))
+        method = getattr(await client(parsed.for_client()), methods[parsed.service_name])
+        parameters = parsed.for_get()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if inspect.iscoroutinefunction(method):
+                    return await method(**parameters)
+                return await loop.run_in_executor(executor, partial(method, **parameters))
+            except Exception as error:  # pylint: disable=broad-except
+                delay = None if retry is None else retry(uri, error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    pending = {}
+    inputs = _inputs(uris).__aiter__()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    uri = await inputs.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(request(uri))] = uri
+
+            if len(pending) == 0:
+                break
+
+            (done, _) = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                uri = pending.pop(task)
+                if task.exception() is not None:
+                    if not return_exceptions:
+                        raise task.exception()
+                    yield (uri, task.exception())
+                else:
+                    yield (uri, task.result())
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,327 @@
+"""
+Index of parsed S3 object URIs that supports prefix queries over keys.
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator, Union
+
+from .b3u import b3u
+
+
+class _node:
+    """
+    Node of a radix trie; the edge leading to a node is labelled with the
+    substring ``label`` and ``count`` is the number of keys in its subtree.
+    """
+    __slots__ = ('label', 'children', 'terminal', 'count')
+
+    def __init__(self, label: str, terminal: bool = False, count: int = 0):
+        self.label = label
+        self.children = {}
+        self.terminal = terminal
+        self.count = count
+
+
+def _common(a: str, b: str) -> int:
+    """
+    Return the length of the longest common prefix of two strings.
+    """
+    length = min(len(a), len(b))
+    i = 0
+    while i < length and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class prefix_index:
+    """
+    Set of S3 objects (each identified by a bucket and a key) in which the
+    keys within each bucket are organized as a radix trie. Objects can be
+    supplied as :obj:`b3u` instances (or any objects that have ``Bucket``
+    and ``Key`` attributes) or as URI strings. Prefixes are interpreted as
+    in S3 (*i.e.*, as arbitrary leading substrings of keys).
+
+    >>> index = prefix_index([
+    ...     's3://bucket/logs/2026-01/a', 's3://bucket/logs/2026-01/b',
+    ...     's3://bucket/logs/2026-02/a', 's3://bucket/data/x', 's3://bucket/logs/2026-01/a'
+    ... ])
+    >>> len(index)
+    4
+    >>> list(index.keys('bucket', 'logs/2026-0'))
+    ['logs/2026-01/a', 'logs/2026-01/b', 'logs/2026-02/a']
+    >>> index.common_prefixes('bucket', 2)
+    ['logs/2026-01/', 'logs/2026-02/']
+    >>> index.cover('bucket', ['logs/2026-01/a', 'logs/2026-01/b', 'data/x'])
+    ['data/x', 'logs/2026-01/']
+    """
+
+    def __init__(self, uris: Iterable[Union[str, b3u]] = ()):
+        self._roots = {}
+        self._size = 0
+        self.update(uris)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, uri: Union[str, b3u]) -> bool:
+        return self._contains(*self._object(uri))
+
+    def _contains(self, bucket: str, key: str) -> bool:
+        found = self._find(bucket, key)
+        return found is not None and found[0].terminal and found[1] == key
+
+    @staticmethod
+    def _object(uri: Union[str, b3u]) -> tuple:
+        if isinstance(uri, str):
+            uri = b3u(uri)
+        if uri.Bucket is None or uri.Key is None:
+            raise ValueError('URI does not identify an S3 object')
+        return (uri.Bucket, uri.Key)
+
+    def buckets(self) -> list:
+        """
+        Return the names of all buckets that contain at least one indexed key.
+        """
+        return sorted(self._roots)
+
+    def update(self, uris: Iterable[Union[str, b3u]]):
+        """
+        Add every object in an iterable to the index.
+        """
+        for uri in uris:
+            self.add(uri)
+
+    def add(self, uri: Union[str, b3u]) -> bool:
+        """
+        Add an object to the index, returning ``False`` if it was already present.
+        """
+        (bucket, key) = self._object(uri)
+        node = self._roots.get(bucket)
+        if node is None:
+            node = self._roots[bucket] = _node('')
+
+        path = [node]
+        i = 0
+        while i < len(key):
+            child = node.children.get(key[i])
+            if child is None:
+                node.children[key[i]] = node = _node(key[i:])
+                path.append(node)
+                break
+
+            length = _common(child.label, key[i:])
+            if length < len(child.label):
+                # Split the edge so that the key ends at (or branches from) a new node.
+                middle = _node(child.label[:length], count=child.count)
+                child.label = child.label[length:]
+                middle.children[child.label[0]] = child
+                node.children[key[i]] = child = middle
+
+            node = child
+            path.append(node)
+            i += length
+
+        if node.terminal:
+            return False
+
+        node.terminal = True
+        for visited in path:
+            visited.count += 1
+        self._size += 1
+        return True
+
+    def remove(self, uri: Union[str, b3u]) -> bool:
+        """
+        Remove an object from the index, returning ``False`` if it was not present.
+        """
+        (bucket, key) = self._object(uri)
+        node = self._roots.get(bucket)
+        if node is None:
+            return False
+
+        path = [node]
+        i = 0
+        while i < len(key):
+            child = node.children.get(key[i])
+            if child is None or not key.startswith(child.label, i):
+                return False
+            node = child
+            path.append(node)
+            i += len(child.label)
+
+        if not node.terminal:
+            return False
+
+        node.terminal = False
+        for visited in path:
+            visited.count -= 1
+        self._size -= 1
+
+        # Remove empty nodes and merge nodes that no longer branch.
+        for depth in range(len(path) - 1, 0, -1):
+            (parent, node) = (path[depth - 1], path[depth])
+            if node.count == 0:
+                del parent.children[node.label[0]]
+            elif not node.terminal and len(node.children) == 1:
+                (child,) = node.children.values()
+                child.label = node.label + child.label
+                parent.children[child.label[0]] = child
+
+        if path[0].count == 0:
+            del self._roots[bucket]
+
+        return True
+
+    def _find(self, bucket: str, prefix: str):
+        """
+        Return the node whose subtree holds exactly the keys that begin with
+        ``prefix`` together with the (complete) path to that node, or ``None``
+        if no keys begin with ``prefix``.
+        """
+        node = self._roots.get(bucket)
+        if node is None:
+            return None
+
+        path = ''
+        i = 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i])
+            if child is None:
+                return None
+            if child.label.startswith(prefix[i:]):
+                return (child, path + child.label)
+            if not prefix.startswith(child.label, i):
+                return None
+            node = child
+            path += child.label
+            i += len(child.label)
+
+        return (node, path)
+
+    @staticmethod
+    def _keys(node: _node, path: str) -> Iterator[str]:
+        # The trie is traversed in preorder using an explicit stack (rather
+        # than recursion), as keys of up to 1024 characters can make it very
+        # deep; children are pushed in reverse so that they are visited in order.
+        stack = [(node, path)]
+        while len(stack) > 0:
+            (node, path) = stack.pop()
+            if node.terminal:
+                yield path
+            for character in sorted(node.children, reverse=True):
+                child = node.children[character]
+                stack.append((child, path + child.label))
+
+    def keys(self, bucket: str, prefix: str = '') -> Iterator[str]:
+        """
+        Yield (in lexicographic order) all indexed keys in a bucket that begin
+        with the supplied prefix.
+        """
+        found = self._find(bucket, prefix)
+        if found is not None:
+            yield from self._keys(*found)
+
+    def count(self, bucket: str, prefix: str = '') -> int:
+        """
+        Return the number of indexed keys in a bucket that begin with the
+        supplied prefix.
+        """
+        found = self._find(bucket, prefix)
+        return 0 if found is None else found[0].count
+
+    def common_prefixes(self, bucket: str, depth: int, prefix: str = '', delimiter: str = '/') -> list:
+        """
+        Return (in lexicographic order) the distinct prefixes that consist of
+        the first ``depth`` delimited segments of the keys that begin with
+        ``prefix`` (*i.e.*, the "directories" at that depth).
+
+        :param bucket: Name of the bucket
+        :param depth: Number of segments (each ending in ``delimiter``)
+        :param prefix: Only keys that begin with this prefix are considered
+        :param delimiter: Character that separates segments
+        """
+        found = self._find(bucket, prefix)
+        if found is None or depth < 1:
+            return []
+
+        # Segments are counted from the start of the key.
+        (node, path) = found
+        remaining = depth - path.count(delimiter)
+        if remaining <= 0:
+            return [path[:_nth(path, delimiter, depth) + 1]]
+
+        # Each entry is a child to examine, along with the path to its parent
+        # and the number of segments that remain to be completed there.
+        prefixes = []
+        stack = [(node.children[c], path, remaining) for c in sorted(node.children, reverse=True)]
+        while len(stack) > 0:
+            (child, path, remaining) = stack.pop()
+            position = -1
+            for _ in range(remaining):
+                position = child.label.find(delimiter, position + 1)
+                if position == -1:
+                    break
+            if position != -1:
+                prefixes.append(path + child.label[:position + 1])
+            else:
+                (path, remaining) = (path + child.label, remaining - child.label.count(delimiter))
+                stack.extend((child.children[c], path, remaining) for c in sorted(child.children, reverse=True))
+        return prefixes
+
+    def cover(self, bucket: str, keys: Iterable[str]) -> list:
+        """
+        Return (in lexicographic order) a minimal list of prefixes such that
+        every supplied key begins with one of the prefixes and every indexed
+        key that begins with one of the prefixes is among the supplied keys.
+        Each prefix is the longest common prefix of the keys that it covers.
+        The only exception is a supplied key that is also a prefix of some
+        indexed key that is not supplied; such a key is included in the list
+        as is (and must be matched exactly rather than as a prefix).
+
+        :param bucket: Name of the bucket
+        :param keys: Indexed keys in the bucket (a :obj:`KeyError` is raised
+            for keys that are not in the index)
+        """
+        root = self._roots.get(bucket)
+        selected = {}
+        for key in set(keys):
+            if not self._contains(bucket, key):
+                raise KeyError(key)
+            (node, i) = (root, 0)
+            selected[id(node)] = selected.get(id(node), 0) + 1
+            while i < len(key):
+                node = node.children[key[i]]
+                selected[id(node)] = selected.get(id(node), 0) + 1
+                i += len(node.label)
+
+        prefixes = []
+        stack = [(root, '')] if root is not None and len(selected) > 0 else []
+        while len(stack) > 0:
+            (node, path) = stack.pop()
+            if selected.get(id(node), 0) == node.count:
+                # Only the root can have a single child without being a key.
+                while not node.terminal and len(node.children) == 1:
+                    (node,) = node.children.values()
+                    path += node.label
+                prefixes.append(path)
+                continue
+            if node.terminal and selected.get(id(node), 0) > sum(
+                    selected.get(id(child), 0) for child in node.children.values()
+            ):
+                # The key at this node is selected but not all of its
+                # extensions are, so it can only be matched exactly.
+                prefixes.append(path)
+            for character in sorted(node.children, reverse=True):
+                child = node.children[character]
+                if selected.get(id(child), 0) > 0:
+                    stack.append((child, path + child.label))
+        return prefixes
+
+
+def _nth(string: str, character: str, n: int) -> int:
+    """
+    Return the index of the ``n``-th occurrence of a character in a string.
+    """
+    position = -1
+    for _ in range(n):
+        position = string.find(character, position + 1)
+    return position
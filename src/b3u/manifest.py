@@ -0,0 +1,102 @@
+"""
+Streaming reader for newline-delimited manifests of AWS resource URIs.
+"""
+from __future__ import annotations
+import os
+import sys
+import mmap
+from typing import Callable, Iterator, Optional, Union
+
+from .b3u import b3u
+
+
+class manifest:
+    """
+    Iterable over the URIs in a newline-delimited manifest (a file path, an
+    open file object or ``'-'`` for the standard input stream) that yields a
+    tuple ``(line_number, value)`` for each non-blank line, where ``value`` is
+    the result of applying ``parse`` to the URI on that line. Lines are read
+    lazily using large buffered reads (or a memory map of the file), so the
+    manifest is never loaded into memory in its entirety.
+
+    Lines that cannot be decoded or parsed (or that have no scheme) do not
+    interrupt iteration; they are skipped and passed to ``on_error`` as
+    ``(line_number, line, exception)`` or, if it is not supplied, recorded
+    in ``errors`` as tuples of that form (for the most recent iteration
+    only). The line is always reported as a string without its surrounding
+    whitespace (with any undecodable bytes escaped).
+
+    >>> import io
+    >>> m = manifest(
+    ...     io.BytesIO(b's3://bucket/a.data\\n\\nbucket/b.data\\ns3://bucket/c.data\\n'),
+    ...     lambda u: b3u(u).for_get()
+    ... )
+    >>> for (number, parameters) in m:
+    ...     print(number, parameters)
+    1 {'Bucket': 'bucket', 'Key': 'a.data'}
+    4 {'Bucket': 'bucket', 'Key': 'c.data'}
+    >>> m.errors
+    [(3, 'bucket/b.data', ValueError('URI has no scheme'))]
+
+    :param source: Path of the manifest, a file object or ``'-'``
+    :param parse: Function to apply to each URI (the :obj:`b3u` constructor
+        by default)
+    :param on_error: Function to call with ``(line_number, line, exception)``
+        for each malformed line
+    :param use_mmap: If true, memory-map the manifest file rather than reading
+        it through a buffer (only applicable when ``source`` is a path)
+    :param buffer_size: Size (in bytes) of the read buffer
+    """
+
+    def __init__(
+            self,
+            source: Union[str, os.PathLike, object],
+            parse: Callable = b3u,
+            on_error: Optional[Callable] = None,
+            use_mmap: bool = False,
+            buffer_size: int = 1 << 20
+    ):
+        self.source = source
+        self.parse = parse
+        self.on_error = on_error
+        self.use_mmap = use_mmap
+        self.buffer_size = buffer_size
+        self.errors = []
+
+    def __iter__(self) -> Iterator[tuple]:
+        self.errors = []
+        if self.source == '-':
+            yield from self._parse(sys.stdin.buffer)
+        elif isinstance(self.source, (str, os.PathLike)):
+            with open(self.source, 'rb', buffering=self.buffer_size) as file:
+                if self.use_mmap and os.fstat(file.fileno()).st_size > 0:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        yield from self._parse(iter(mapped.readline, b''))
+                else:
+                    yield from self._parse(file)
+        else:
+            yield from self._parse(self.source)
+
+    def _parse(self, lines) -> Iterator[tuple]:
+        parse = self.parse
+        for (number, line) in enumerate(lines, 1):
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                line = line.strip()
+                if line == '':
+                    continue
+                if '://' not in line:
+                    raise ValueError('URI has no scheme')
+                value = parse(line)
+            except ValueError as error:
+                if isinstance(line, bytes):  # The line could not be decoded.
+                    line = line.decode('utf-8', 'backslashreplace')
+                line = line.strip()
+                if self.on_error is None:
+                    self.errors.append((number, line, error))
+                else:
+                    self.on_error(number, line, error)
+                continue
+
+            yield (number, value)
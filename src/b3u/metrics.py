@@ -0,0 +1,122 @@
+"""
+Opt-in instrumentation of the parsing and extraction methods of
+:obj:`b3u.b3u.b3u` (and of the parse cache and client pool).
+"""
+from __future__ import annotations
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+# Pairs of (hit, miss) outcomes from which the hit rate of an event is derived.
+_RATES = {'cache': ('hit', 'miss'), 'pool': ('reused', 'created')}
+
+
+class metrics:
+    """
+    Thread-safe collector of counts and timing histograms for each operation
+    (*e.g.*, ``construct`` or ``for_client``) and service name, and of counts
+    of the outcomes of events (such as hits and misses of the parse cache).
+    Instances of this class are typically created via :obj:`b3u.enable_metrics`.
+
+    Only operation names, service names (*i.e.*, URI schemes), outcomes and
+    durations are recorded; no other attribute values (and, in particular,
+    no credentials) are ever supplied to a collector or to its sink.
+
+    >>> m = metrics(clock=iter([0, 300, 1000, 1700]).__next__)
+    >>> m.record('construct', 's3', m.clock())
+    >>> m.record('construct', 's3', m.clock())
+    >>> m.count('cache', 'miss')
+    >>> m.snapshot()['operations']
+    {'construct': {'s3': {'count': 2, 'total_ns': 1000, 'histogram': {512: 1, 1024: 1}}}}
+    >>> m.snapshot()['hit_rates']
+    {'cache': 0.0}
+
+    :param sink: Function that is invoked as ``sink(operation, service_name,
+        nanoseconds)`` after each timed operation and as ``sink(event, outcome,
+        None)`` after each counted event
+    :param clock: Function that returns the current time in nanoseconds
+    """
+
+    def __init__(
+            self,
+            sink: Optional[Callable[[str, Optional[str], Optional[int]], None]] = None,
+            clock: Callable[[], int] = time.perf_counter_ns
+    ):
+        self.sink = sink
+        self.clock = clock
+        self._timings = {}
+        self._counters = {}
+        self._lock = Lock()
+
+    def record(self, operation: str, service_name: Optional[str], start: int):
+        """
+        Record the completion of an operation that began at the supplied time
+        (as returned by :obj:`clock`). Durations are counted in histogram
+        buckets bounded by powers of two (each duration is counted in the
+        bucket with the smallest bound that exceeds it).
+
+        :param operation: Name of the operation
+        :param service_name: Service name of the URI on which it operated
+        :param start: Time at which the operation began
+        """
+        elapsed = self.clock() - start
+        bound = 1 << max(elapsed, 0).bit_length()
+        key = (operation, service_name)
+        with self._lock:
+            entry = self._timings.get(key)
+            if entry is None:
+                entry = self._timings[key] = [0, 0, {}]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2][bound] = entry[2].get(bound, 0) + 1
+
+        if self.sink is not None:
+            self.sink(operation, service_name, elapsed)
+
+    def count(self, event: str, outcome: str):
+        """
+        Count an outcome of an event (such as a ``hit`` of the ``cache``).
+        """
+        key = (event, outcome)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+        if self.sink is not None:
+            self.sink(event, outcome, None)
+
+    def snapshot(self) -> dict:
+        """
+        Return the counts, total durations and duration histograms for each
+        operation and service name, the counts of the outcomes of each event
+        and the hit rates of the parse cache and client pool (for those that
+        have been used).
+        """
+        with self._lock:
+            operations = {}
+            for ((operation, service_name), (count, total, histogram)) in self._timings.items():
+                operations.setdefault(operation, {})[service_name] = {
+                    'count': count,
+                    'total_ns': total,
+                    'histogram': dict(sorted(histogram.items()))
+                }
+
+            counters = {}
+            for ((event, outcome), count) in self._counters.items():
+                counters.setdefault(event, {})[outcome] = count
+
+        rates = {}
+        for (event, (hit, miss)) in _RATES.items():
+            outcomes = counters.get(event, {})
+            total = outcomes.get(hit, 0) + outcomes.get(miss, 0)
+            if total > 0:
+                rates[event] = outcomes.get(hit, 0) / total
+
+        return {'operations': operations, 'counters': counters, 'hit_rates': rates}
+
+    def reset(self):
+        """
+        Discard everything recorded so far.
+        """
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
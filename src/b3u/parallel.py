@@ -0,0 +1,161 @@
+"""
+Parallel parsing of large newline-delimited manifests of AWS resource URIs
+using a pool of worker processes.
+"""
+from __future__ import annotations
+import os
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from .b3u import b3u, columns, _SERVICES
+
+
+def chunks(path: str, chunk_size: int) -> list:
+    """
+    Split a file into byte ranges ``(start, end)`` of roughly ``chunk_size``
+    bytes, each of which (other than the last) ends immediately after a
+    newline character.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile(delete=False) as file:
+    ...     _ = file.write(b'aaaa\\nbb\\ncccccc\\nd\\n')
+    >>> chunks(file.name, 6)
+    [(0, 8), (8, 15), (15, 17)]
+    >>> os.remove(file.name)
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk size must be a positive integer')
+
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size) - 1)
+            file.readline()  # Advance to the end of the line.
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _services() -> dict:
+    """
+    Return the registered services that can be sent to a worker process
+    (those with extractors that cannot be pickled, such as lambda functions,
+    are omitted).
+    """
+    services = {}
+    for (scheme, service) in _SERVICES.items():
+        try:
+            pickle.dumps(service)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            continue
+        services[scheme] = service
+    return services
+
+
+def _parse_chunk(task: tuple) -> tuple:
+    """
+    Parse the lines within a byte range of a file, returning the parsed URIs
+    as a :obj:`columns` object, the malformed lines (numbered from the start
+    of the range) and the number of lines in the range. The task includes
+    the registered services (see :obj:`b3u.register`) that can be pickled,
+    which are added to the registry of a worker process first, as workers
+    that are started afresh (rather than forked) only have the built-in
+    services. The registry of the process that supplied the task is never
+    modified.
+    """
+    (path, start, end, services, parent) = task
+    if parent != os.getpid():
+        changed = {scheme: service for (scheme, service) in services.items() if _SERVICES.get(scheme) != service}
+        if len(changed) > 0:
+            _SERVICES.update(changed)
+            if b3u._cache is not None:  # pylint: disable=protected-access
+                b3u._cache.clear()  # pylint: disable=protected-access
+
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    lines = data.split(b'\n')
+    if lines[-1] == b'':
+        lines.pop()
+
+    (uris, numbers, errors) = ([], [], [])
+    for (number, line) in enumerate(lines, 1):
+        try:
+            line = line.decode('utf-8').strip()
+        except ValueError as error:
+            # Reported as by :obj:`b3u.manifest.manifest` (with undecodable bytes escaped).
+            errors.append((number, line.decode('utf-8', 'backslashreplace').strip(), error))
+            continue
+        if line == '':
+            continue
+        if '://' not in line:
+            errors.append((number, line, ValueError('URI has no scheme')))
+            continue
+        uris.append(line)
+        numbers.append(number)
+
+    failures = []
+    result = b3u.parse_many(uris, failures)
+    errors.extend((numbers[index], uri, error) for (index, uri, error) in failures)
+    errors.sort(key=lambda error: error[0])
+
+    return (result, errors, len(lines))
+
+
+def parse_file(
+        path: str,
+        workers: Optional[int] = None,
+        chunk_size: int = 1 << 26,
+        executor: Optional[Executor] = None
+) -> tuple:
+    """
+    Parse every URI in a newline-delimited manifest file by dividing the file
+    into chunks (aligned on line boundaries) that are parsed concurrently by
+    worker processes. Each worker returns the URIs in its chunk in columnar
+    form (see :obj:`b3u.parse_many`) and the results are combined in the order
+    of the chunks, so the output does not depend on the number of workers.
+
+    Blank lines are skipped. Lines that cannot be decoded or parsed (or that
+    have no scheme) are omitted from the result and returned separately as
+    tuples ``(line_number, line, exception)``. Services registered with an
+    extractor that cannot be pickled are only available to workers that are
+    forked from the current process.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile(delete=False) as file:
+    ...     _ = file.write(b's3://bucket/a\\nbucket/b\\n\\ns3://bucket/c?region_name=us-east-1\\n')
+    >>> (result, errors) = parse_file(file.name, workers=2, chunk_size=8)
+    >>> result.Key, result.region_name
+    (['a', 'c'], [None, 'us-east-1'])
+    >>> errors
+    [(2, 'bucket/b', ValueError('URI has no scheme'))]
+    >>> os.remove(file.name)
+
+    :param path: Path of the manifest file
+    :param workers: Number of worker processes (by default, the number of CPUs)
+    :param chunk_size: Approximate size (in bytes) of each chunk
+    :param executor: Executor to use in place of a new process pool
+    :return: Tuple containing a :obj:`columns` object and a list of errors
+    """
+    (services, parent) = (_services(), os.getpid())
+    tasks = [(path, start, end, services, parent) for (start, end) in chunks(path, chunk_size)]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_chunk, tasks))
+    else:
+        results = list(executor.map(_parse_chunk, tasks))
+
+    (result, errors) = (columns(), [])
+    offset = 0
+    for (part, part_errors, count) in results:
+        result.extend(part)
+        errors.extend((offset + number, line, error) for (number, line, error) in part_errors)
+        offset += count
+
+    return (result, errors)
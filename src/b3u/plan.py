@@ -0,0 +1,134 @@
+"""
+Planners that group many S3 object URIs into batched request payloads for
+bulk operations.
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator, Union
+
+from .b3u import b3u
+from .pool import client_pool
+
+# Maximum number of keys that can be supplied to a single ``DeleteObjects`` call.
+DELETE_LIMIT = 1000
+
+
+def _object(uri: Union[str, b3u]) -> b3u:
+    """
+    Parse a URI (if necessary) and confirm that it identifies an S3 object.
+    The error message omits the credentials (so that it is safe to log).
+
+    >>> _object('ssm://abc:xyz@/parameter')
+    Traceback (most recent call last):
+      ...
+    ValueError: URI does not identify an S3 object (scheme 'ssm', bucket None, key None)
+    """
+    if isinstance(uri, str):
+        uri = b3u(uri)
+    if uri.service_name != 's3' or uri.Bucket is None or not uri.Key:
+        raise ValueError(
+            'URI does not identify an S3 object (scheme ' + repr(uri.service_name) +
+            ', bucket ' + repr(uri.Bucket) + ', key ' + repr(uri.Key) + ')'
+        )
+    return uri
+
+
+def _batches(items: Iterable[tuple], size: int) -> Iterator[tuple]:
+    """
+    Group ``(group, client_parameters, item)`` triples into lists of at most
+    ``size`` items per group. Each list is emitted as soon as it is full, and
+    any incomplete lists are emitted (in the order in which their groups were
+    first encountered) once the input is exhausted.
+    """
+    if size < 1:
+        raise ValueError('batch size must be a positive integer')
+
+    pending = {}
+    for (group, parameters, item) in items:
+        if group not in pending:
+            pending[group] = (parameters, [])
+        batch = pending[group][1]
+        batch.append(item)
+        if len(batch) == size:
+            yield (parameters, group[1], batch)
+            pending[group] = (parameters, [])
+
+    for (group, (parameters, batch)) in pending.items():
+        if len(batch) > 0:
+            yield (parameters, group[1], batch)
+
+
+def delete_batches(
+        uris: Iterable[Union[str, b3u]],
+        batch_size: int = DELETE_LIMIT,
+        quiet: bool = False
+) -> Iterator[tuple]:
+    """
+    Group S3 object URIs by client parameters (as returned by
+    :obj:`b3u.for_client`) and bucket, lazily yielding a tuple
+    ``(client_parameters, request)`` for each ``DeleteObjects`` request
+    (each covering at most ``batch_size`` keys).
+
+    >>> for (ps, request) in delete_batches([
+    ...     's3://abc:xyz@bucket/a.data', 's3://abc:xyz@other/b.data', 's3://abc:xyz@bucket/c.data'
+    ... ]):
+    ...     print(request)
+    {'Bucket': 'bucket', 'Delete': {'Objects': [{'Key': 'a.data'}, {'Key': 'c.data'}]}}
+    {'Bucket': 'other', 'Delete': {'Objects': [{'Key': 'b.data'}]}}
+
+    A client for each request can be obtained by supplying ``client_parameters``
+    to :obj:`b3u.pool.client_pool.get`.
+
+    :param uris: URI strings or :obj:`b3u` instances identifying S3 objects
+    :param batch_size: Maximum number of keys per request
+    :param quiet: Value of the ``Quiet`` option for each request (omitted if false)
+    """
+    if batch_size > DELETE_LIMIT:
+        raise ValueError('DeleteObjects accepts at most ' + str(DELETE_LIMIT) + ' keys')
+
+    def items():
+        for uri in uris:
+            uri = _object(uri)
+            parameters = uri.for_client()
+            yield ((client_pool.key(parameters), uri.Bucket), parameters, {'Key': uri.Key})
+
+    for (parameters, bucket, objects) in _batches(items(), batch_size):
+        delete = {'Objects': objects}
+        if quiet:
+            delete['Quiet'] = True
+        yield (parameters, {'Bucket': bucket, 'Delete': delete})
+
+
+def copy_batches(
+        pairs: Iterable[tuple],
+        batch_size: int = DELETE_LIMIT
+) -> Iterator[tuple]:
+    """
+    Group ``(source, destination)`` pairs of S3 object URIs by the client
+    parameters and bucket of the destination, lazily yielding a tuple
+    ``(client_parameters, requests)`` in which ``requests`` is a list of at
+    most ``batch_size`` ``CopyObject`` request payloads (which can be
+    submitted together to an executor using a single client).
+
+    >>> for (ps, requests) in copy_batches([('s3://src/a.data', 's3://abc:xyz@dst/b.data')]):
+    ...     print(ps['aws_access_key_id'], requests)
+    abc [{'Bucket': 'dst', 'Key': 'b.data', 'CopySource': {'Bucket': 'src', 'Key': 'a.data'}}]
+
+    :param pairs: Pairs of URI strings or :obj:`b3u` instances
+    :param batch_size: Maximum number of requests per batch
+    """
+    def items():
+        for (source, destination) in pairs:
+            (source, destination) = (_object(source), _object(destination))
+            parameters = destination.for_client()
+            yield (
+                (client_pool.key(parameters), destination.Bucket),
+                parameters,
+                {
+                    'Bucket': destination.Bucket,
+                    'Key': destination.Key,
+                    'CopySource': {'Bucket': source.Bucket, 'Key': source.Key}
+                }
+            )
+
+    for (parameters, _, requests) in _batches(items(), batch_size):
+        yield (parameters, requests)
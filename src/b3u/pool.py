@@ -0,0 +1,231 @@
+"""
+Thread-safe pool of Boto3 clients (or resources) keyed on the client
+configuration extracted from AWS resource URIs.
+"""
+from __future__ import annotations
+import time
+from threading import Lock
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+from .b3u import b3u
+
+
+def _hashable(value):
+    """
+    Convert a configuration value into an equivalent hashable value.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for (k, v) in value.items()))
+    if isinstance(value, (list, set)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _parameters(target: Union[str, b3u, dict]) -> dict:
+    """
+    Return the client parameters for a URI string, :obj:`b3u` instance or
+    dictionary of client parameters.
+    """
+    if isinstance(target, str):
+        target = b3u(target)
+    return target if isinstance(target, dict) else target.for_client()
+
+
+def _count(outcome: str):
+    """
+    Count an outcome of a request for a client if instrumentation is enabled
+    (see :obj:`b3u.enable_metrics`).
+    """
+    metrics = b3u._metrics  # pylint: disable=protected-access
+    if metrics is not None:
+        metrics.count('pool', outcome)
+
+
+class client_pool:
+    """
+    Pool of clients in which all URIs that have identical client parameters
+    (as returned by :obj:`b3u.for_client`) share a single client. Clients are
+    created by ``factory`` (``boto3.client`` by default) on first use.
+
+    >>> pool = client_pool(factory=lambda **ps: object())
+    >>> c = pool.get('s3://abc:xyz@bucket/a.data?region_name=us-east-1')
+    >>> c is pool.get(b3u('s3://abc:xyz@other-bucket/b.data?region_name=us-east-1'))
+    True
+    >>> c is pool.get('s3://abc:xyz@bucket/a.data?region_name=us-west-2')
+    False
+    >>> pool.info()
+    {'created': 2, 'reused': 1, 'evicted': 0, 'expired': 0, 'size': 2}
+
+    :param factory: Function that accepts the client parameters as keyword
+        arguments and returns a client (or pass ``boto3.resource`` to pool
+        resources instead)
+    :param maxsize: Maximum number of clients to retain; the least recently
+        used client is evicted once this bound is exceeded
+    :param idle: Number of seconds after which an unused client expires (or
+        ``None`` if clients should not expire)
+    :param clock: Function that returns the current time in seconds
+    """
+
+    def __init__(
+            self,
+            factory: Optional[Callable] = None,
+            maxsize: int = 64,
+            idle: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        if maxsize < 1:
+            raise ValueError('pool size must be a positive integer')
+
+        self.factory = factory
+        self.maxsize = maxsize
+        self.idle = idle
+        self.clock = clock
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.expired = 0
+        self._entries = OrderedDict()
+        self._creating = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def key(parameters: dict) -> tuple:
+        """
+        Convert a dictionary of client parameters into a canonical hashable
+        key (that does not depend on the order of the entries).
+
+        >>> client_pool.key({'service_name': 's3', 'region_name': 'us-east-1'})
+        (('region_name', 'us-east-1'), ('service_name', 's3'))
+        """
+        return _hashable(parameters)
+
+    def get(self, target: Union[str, b3u, dict]):
+        """
+        Return the client for a URI, creating it if the pool does not already
+        hold a client with the same parameters.
+
+        :param target: URI string, :obj:`b3u` instance or dictionary of client
+            parameters (as returned by :obj:`b3u.for_client`)
+        """
+        parameters = _parameters(target)
+        key = self.key(parameters)
+
+        with self._lock:
+            client = self._lookup(key)
+            if client is None:
+                creating = self._creating.setdefault(key, Lock())
+
+        if client is not None:
+            _count('reused')
+            return client
+
+        # Only one thread creates the client for any given key; other threads
+        # requesting the same key wait for it rather than creating their own.
+        with creating:
+            with self._lock:
+                client = self._lookup(key)
+            if client is not None:
+                _count('reused')
+                return client
+
+            factory = self.factory
+            if factory is None:
+                import boto3  # pylint: disable=import-outside-toplevel
+                factory = boto3.client
+            try:
+                client = factory(**parameters)
+            except BaseException:
+                with self._lock:
+                    self._creating.pop(key, None)
+                raise
+
+            # The client is pooled in the same step in which the creation
+            # lock is discarded, so no other thread can create another.
+            with self._lock:
+                self._creating.pop(key, None)
+                self.created += 1
+                self._entries[key] = [client, self.clock()]
+                self._expire()
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evicted += 1
+
+        _count('created')
+        return client
+
+    def lookup(self, target: Union[str, b3u, dict]):
+        """
+        Return the pooled client for a URI without creating it (or ``None``
+        if the pool does not hold a client with the same parameters). Unlike
+        :obj:`get`, this method never waits for a client to be created.
+
+        >>> pool = client_pool(factory=lambda **ps: object())
+        >>> pool.lookup('s3://bucket/a.data?region_name=us-east-1') is None
+        True
+        >>> c = pool.get('s3://bucket/a.data?region_name=us-east-1')
+        >>> pool.lookup('s3://other/b.data?region_name=us-east-1') is c
+        True
+
+        :param target: URI string, :obj:`b3u` instance or dictionary of client
+            parameters (as returned by :obj:`b3u.for_client`)
+        """
+        key = self.key(_parameters(target))
+        with self._lock:
+            client = self._lookup(key)
+
+        if client is not None:
+            _count('reused')
+        return client
+
+    def _lookup(self, key: tuple):
+        # Must be invoked while holding the lock.
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        now = self.clock()
+        if self.idle is not None and now - entry[1] > self.idle:
+            del self._entries[key]
+            self.expired += 1
+            return None
+
+        entry[1] = now
+        self._entries.move_to_end(key)
+        self.reused += 1
+        return entry[0]
+
+    def _expire(self):
+        # Must be invoked while holding the lock. Entries are ordered from
+        # least to most recently used, so only a prefix can have expired.
+        if self.idle is None:
+            return
+
+        now = self.clock()
+        while len(self._entries) > 0:
+            (key, entry) = next(iter(self._entries.items()))
+            if now - entry[1] <= self.idle:
+                break
+            del self._entries[key]
+            self.expired += 1
+
+    def info(self) -> dict:
+        """
+        Return the number of clients created, reused, evicted and expired,
+        and the current size of the pool.
+        """
+        with self._lock:
+            return {
+                'created': self.created,
+                'reused': self.reused,
+                'evicted': self.evicted,
+                'expired': self.expired,
+                'size': len(self._entries)
+            }
+
+    def clear(self):
+        """
+        Discard all pooled clients (the statistics are retained).
+        """
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,226 @@
+"""
+Byte-range expressions within S3 object URIs, and planning and execution of
+parallel ranged reads of large objects.
+"""
+from __future__ import annotations
+import mmap
+from contextlib import nullcontext
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Union
+
+from .b3u import b3u
+from .plan import _object
+
+# Name of the query parameter that holds a byte-range expression.
+PARAMETER = 'range'
+
+# Default size (in bytes) of each part of a ranged read.
+PART_SIZE = 8 << 20
+
+# Number of bytes copied from a response body at once.
+_CHUNK_SIZE = 1 << 20
+
+
+def byte_range(uri: Union[str, b3u]) -> Optional[tuple]:
+    """
+    Return the byte range specified in a URI (either as the ``range`` query
+    parameter or as the fragment) as a pair ``(first, last)`` of inclusive
+    byte offsets, or ``None`` if no range is specified. Expressions follow
+    the HTTP ``Range`` header (with or without the ``bytes=`` prefix): the
+    last offset may be omitted (as in ``100-``) to read to the end of the
+    object, and ``-n`` denotes the last ``n`` bytes (which is represented
+    as ``(None, n)``). The fragment is only available if a URI string is
+    supplied.
+
+    >>> byte_range('s3://bucket/object.data?range=bytes=0-1023')
+    (0, 1023)
+    >>> byte_range('s3://bucket/object.data#100-')
+    (100, None)
+    >>> byte_range(b3u('s3://bucket/object.data?range=-500'))
+    (None, 500)
+    >>> byte_range('s3://bucket/object.data') is None
+    True
+    """
+    expression = None
+    if isinstance(uri, str):
+        (uri, _, expression) = uri.partition('#')
+        uri = b3u(uri)
+    if PARAMETER in uri.custom_values:
+        expression = getattr(uri, PARAMETER)
+    if not expression:
+        return None
+
+    (unit, _, interval) = expression.rpartition('=')
+    (first, separator, last) = interval.partition('-')
+    if (
+        unit not in ('', 'bytes') or separator == '' or not (first + last).isascii() or
+        not (first + last).isdecimal() or (last == '' and first == '')
+    ):
+        raise ValueError('invalid byte range: ' + expression)
+
+    (first, last) = (int(first) if first else None, int(last) if last else None)
+    if first is not None and last is not None and last < first:
+        raise ValueError('invalid byte range: ' + expression)
+
+    return (first, last)
+
+
+def _parts(interval: Optional[tuple], size: int, part_size: int) -> list:
+    """
+    Resolve a byte range against the size of an object and divide it into
+    half-open intervals ``(start, stop)`` that do not cross multiples of the
+    part size.
+    """
+    if part_size < 1:
+        raise ValueError('part size must be a positive integer')
+
+    (start, stop) = (0, size)
+    if interval is not None:
+        (first, last) = interval
+        if first is None:
+            start = max(size - last, 0)
+        else:
+            (start, stop) = (first, size if last is None else min(last + 1, size))
+            if start >= size:
+                raise ValueError('byte range is not satisfiable for an object of ' + str(size) + ' bytes')
+
+    parts = []
+    while start < stop:
+        end = min((start // part_size + 1) * part_size, stop)
+        parts.append((start, end))
+        start = end
+    return parts
+
+
+def _requests(parsed: b3u, parts: list, if_match: Optional[str]) -> list:
+    """
+    Build the ``get_object`` request parameters for each part of a read.
+    """
+    parameters = parsed.for_get()
+    if if_match is not None:
+        parameters['IfMatch'] = if_match
+    return [
+        {**parameters, 'Range': 'bytes=' + str(start) + '-' + str(stop - 1)}
+        for (start, stop) in parts
+    ]
+
+
+def plan(
+        uri: Union[str, b3u],
+        size: int,
+        part_size: int = PART_SIZE,
+        if_match: Optional[str] = None
+) -> list:
+    """
+    Divide a read of an S3 object (or of the byte range specified in its
+    URI; see :obj:`byte_range`) into parts, returning the parameters for
+    the ``get_object`` request for each part. Part boundaries are aligned
+    to multiples of ``part_size`` within the object.
+
+    >>> for ps in plan('s3://bucket/object.data?range=bytes=100-', 300, 128):
+    ...     print(ps)
+    {'Bucket': 'bucket', 'Key': 'object.data', 'Range': 'bytes=100-127'}
+    {'Bucket': 'bucket', 'Key': 'object.data', 'Range': 'bytes=128-255'}
+    {'Bucket': 'bucket', 'Key': 'object.data', 'Range': 'bytes=256-299'}
+
+    :param uri: URI string or :obj:`b3u` instance identifying an S3 object
+    :param size: Size of the object in bytes
+    :param part_size: Maximum number of bytes per part
+    :param if_match: Entity tag that every part must match (so that parts of
+        different versions of an object are never combined)
+    """
+    interval = byte_range(uri)
+    parsed = _object(uri.partition('#')[0] if isinstance(uri, str) else uri)
+    return _requests(parsed, _parts(interval, size, part_size), if_match)
+
+
+def download(
+        uri: Union[str, b3u],
+        path: str,
+        size: Optional[int] = None,
+        part_size: int = PART_SIZE,
+        if_match: Optional[str] = None,
+        client=None,
+        workers: int = 8,
+        executor: Optional[Executor] = None,
+        use_mmap: bool = False
+) -> int:
+    """
+    Read an S3 object (or the byte range specified in its URI) into a file
+    by retrieving its parts (see :obj:`plan`) concurrently using a thread
+    pool. The file is allocated at its final size before any part is read,
+    and each part is written directly to its position in the file (either
+    through a separate file handle or, if ``use_mmap`` is true, into a
+    memory map of the file).
+
+    >>> import io, os, tempfile
+    >>> class stub:
+    ...     def get_object(self, Bucket, Key, Range):
+    ...         (start, end) = map(int, Range[6:].split('-'))
+    ...         return {'Body': io.BytesIO(b'0123456789'[start:end + 1])}
+    >>> with tempfile.NamedTemporaryFile(delete=False) as file:
+    ...     pass
+    >>> download('s3://bucket/object.data#2-8', file.name, size=10, part_size=3, client=stub())
+    7
+    >>> with open(file.name, 'rb') as file:
+    ...     file.read()
+    b'2345678'
+    >>> os.remove(file.name)
+
+    :param uri: URI string or :obj:`b3u` instance identifying an S3 object
+    :param path: Path of the output file (which is created or truncated)
+    :param size: Size of the object in bytes (determined via ``head_object``
+        if it is not supplied)
+    :param part_size: Maximum number of bytes per part
+    :param if_match: Entity tag that every part must match
+    :param client: S3 client (by default, obtained from a
+        :obj:`b3u.pool.client_pool` using the parameters in the URI)
+    :param workers: Number of threads (if no executor is supplied)
+    :param executor: Executor to use in place of a new thread pool
+    :param use_mmap: Whether to write the parts into a memory map of the file
+    :return: Number of bytes written
+    """
+    interval = byte_range(uri)
+    parsed = _object(uri.partition('#')[0] if isinstance(uri, str) else uri)
+    if client is None:
+        from .pool import client_pool  # pylint: disable=import-outside-toplevel
+        client = client_pool().get(parsed)
+    if size is None:
+        size = client.head_object(**parsed.for_get())['ContentLength']
+
+    parts = _parts(interval, size, part_size)
+    requests = _requests(parsed, parts, if_match)
+    origin = parts[0][0] if len(parts) > 0 else 0
+    length = parts[-1][1] - origin if len(parts) > 0 else 0
+
+    with open(path, 'wb') as file:
+        file.truncate(length)
+    if length == 0:
+        return 0
+
+    def read(task: tuple) -> int:
+        ((start, stop), parameters) = task
+        body = client.get_object(**parameters)['Body']
+        (position, end) = (start - origin, stop - origin)
+        with (nullcontext() if mapped is not None else open(path, 'r+b')) as output:
+            if output is not None:
+                output.seek(position)
+            while position < end:
+                chunk = body.read(min(_CHUNK_SIZE, end - position))
+                if len(chunk) == 0:
+                    break
+                if output is None:
+                    mapped[position:position + len(chunk)] = chunk
+                else:
+                    output.write(chunk)
+                position += len(chunk)
+        if position != end:
+            raise IOError('response is shorter than the part ' + parameters['Range'])
+        return stop - start
+
+    with open(path, 'r+b') as file, (mmap.mmap(file.fileno(), length) if use_mmap else nullcontext()) as mapped:
+        tasks = list(zip(parts, requests))
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return sum(pool.map(read, tasks))
+        return sum(executor.map(read, tasks))
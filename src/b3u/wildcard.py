@@ -0,0 +1,157 @@
+"""
+Wildcard S3 URIs (such as ``s3://bucket/logs/2026-*/part-*.parquet``) that
+are compiled into ``ListObjectsV2`` requests and a matcher for the keys that
+those requests return.
+"""
+from __future__ import annotations
+import re
+from typing import Iterator, Optional, Union
+
+from .b3u import b3u
+
+# Characters that begin a wildcard within a key.
+_WILDCARDS = '*['
+
+
+def _translate(pattern: str) -> str:
+    """
+    Translate a wildcard pattern into a regular expression. Within a pattern,
+    ``*`` matches any sequence of characters other than ``/``, ``**`` matches
+    any sequence of characters (and ``**/`` matches any sequence of complete
+    segments, including none) and ``[...]`` matches one of the enclosed
+    characters (or, as ``[!...]``, one character other than ``/`` that is
+    not enclosed).
+
+    >>> _translate('logs/**/part-[!0-4]*.parquet')
+    'logs/(?:.*/)?part\\\\-[^/0-4][^/]*\\\\.parquet'
+    """
+    (i, n, parts) = (0, len(pattern), [])
+    while i < n:
+        character = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif character == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif character == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                parts.append(re.escape(character))
+                i += 1
+                continue
+            members = pattern[i + 1:end].replace('\\', '\\\\')
+            if members[0] == '!':
+                members = '^/' + members[1:]
+            elif members[0] == '^':
+                members = '\\' + members
+            parts.append('[' + members + ']')
+            i = end + 1
+        else:
+            parts.append(re.escape(character))
+            i += 1
+    return ''.join(parts)
+
+
+class wildcard:
+    """
+    Compiled wildcard URI identifying a set of S3 objects. The wildcards in
+    the key are described in :obj:`_translate` (``?`` is not a wildcard, as
+    it begins the query string). The longest literal prefix of the key is
+    used as the ``Prefix`` of the listing and, if no wildcard can match
+    beyond the final ``/``, the listing is restricted to that level using
+    ``/`` as its ``Delimiter`` (which is never used if a bracket expression
+    follows the prefix, as such an expression may match ``/``).
+
+    >>> w = wildcard('s3://abc:xyz@bucket/logs/2026-*/part-*.parquet?region_name=us-east-1')
+    >>> w.plan()
+    {'Bucket': 'bucket', 'Prefix': 'logs/2026-'}
+    >>> w.matches('logs/2026-01/part-0.parquet'), w.matches('logs/2026-01/x/part-0.parquet')
+    (True, False)
+    >>> wildcard('s3://bucket/logs/2026-01/part-*.parquet').plan()
+    {'Bucket': 'bucket', 'Prefix': 'logs/2026-01/part-', 'Delimiter': '/'}
+
+    :param uri: URI string or :obj:`b3u` instance whose key may contain wildcards
+    """
+
+    def __init__(self, uri: Union[str, b3u]):
+        self.uri = b3u(uri) if isinstance(uri, str) else uri
+        if self.uri.service_name != 's3' or self.uri.Bucket is None:
+            # The credentials are omitted (so that the message is safe to log).
+            raise ValueError(
+                'URI does not identify S3 objects (scheme ' + repr(self.uri.service_name) +
+                ', bucket ' + repr(self.uri.Bucket) + ')'
+            )
+
+        pattern = self.uri.Key or ''
+        literal = min((pattern.find(c) for c in _WILDCARDS if c in pattern), default=len(pattern))
+        self.pattern = pattern
+        self.prefix = pattern[:literal]
+        remainder = pattern[literal:]
+        self.delimiter = '/' if remainder != '' and not any(s in remainder for s in ('/', '**', '[')) else None
+        try:
+            self._match = re.compile(_translate(pattern), re.DOTALL).fullmatch
+        except re.error as error:
+            # A bracket expression may be invalid (e.g., a reversed range such as ``[z-a]``).
+            raise ValueError('invalid wildcard pattern ' + repr(pattern) + ': ' + str(error)) from None
+
+    def matches(self, key: str) -> bool:
+        """
+        Determine whether a key matches the pattern.
+        """
+        return self._match(key) is not None
+
+    def plan(self) -> dict:
+        """
+        Return the parameters of the ``ListObjectsV2`` request (other than any
+        continuation token) that lists the candidate keys.
+        """
+        parameters = {'Bucket': self.uri.Bucket, 'Prefix': self.prefix}
+        if self.delimiter is not None:
+            parameters['Delimiter'] = self.delimiter
+        return parameters
+
+    def keys(self, client=None, page_size: Optional[int] = None) -> Iterator[str]:
+        """
+        List the candidate keys one page at a time, lazily yielding (in the
+        order returned by S3) each key that matches the pattern.
+
+        >>> class stub:
+        ...     def list_objects_v2(self, Bucket, Prefix, ContinuationToken='0', **ps):
+        ...         keys = ['logs/a.csv', 'logs/b.json', 'logs/c.csv']
+        ...         i = int(ContinuationToken)
+        ...         return {'Contents': [{'Key': keys[i]}], 'IsTruncated': i < 2, 'NextContinuationToken': str(i + 1)}
+        >>> list(wildcard('s3://bucket/logs/*.csv').keys(stub()))
+        ['logs/a.csv', 'logs/c.csv']
+
+        :param client: S3 client (by default, obtained from a
+            :obj:`b3u.pool.client_pool` using the parameters in the URI)
+        :param page_size: Maximum number of keys requested per page
+        """
+        if client is None:
+            from .pool import client_pool  # pylint: disable=import-outside-toplevel
+            client = client_pool().get(self.uri)
+
+        parameters = self.plan()
+        if page_size is not None:
+            parameters['MaxKeys'] = page_size
+
+        match = self._match
+        while True:
+            response = client.list_objects_v2(**parameters)
+            for entry in response.get('Contents', ()):
+                if match(entry['Key']) is not None:
+                    yield entry['Key']
+            if not response.get('IsTruncated'):
+                break
+            parameters['ContinuationToken'] = response['NextContinuationToken']
+
+    def uris(self, client=None, page_size: Optional[int] = None) -> Iterator[b3u]:
+        """
+        Lazily yield a :obj:`b3u` instance (derived from the URI of the
+        pattern via :obj:`b3u.with_keys`) for each matching key.
+        """
+        return self.uri.with_keys(self.keys(client, page_size))
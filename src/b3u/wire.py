@@ -0,0 +1,153 @@
+"""
+Packed binary format for transferring many parsed URIs between processes
+(or storing them) without reparsing them on arrival.
+"""
+from __future__ import annotations
+import sys
+import struct
+from array import array
+from functools import partial
+from itertools import accumulate
+from typing import Iterable
+
+from .b3u import b3u, _FIELDS, _restore
+
+# Leading bytes that identify (and version) the format.
+MAGIC = b'B3U1'
+
+# Magic bytes, type code of the references, number of distinct strings,
+# number of references and length (in bytes) of the encoded strings, in
+# little-endian order.
+_HEADER = struct.Struct('<4scIII')
+
+
+def _little_endian(values: array) -> array:
+    """
+    Convert an array between native and little-endian byte order (in place).
+    """
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def dumps(objects: Iterable) -> bytes:
+    """
+    Encode the standard attributes and custom values of :obj:`b3u` (or
+    :obj:`b3u.compact.compact`) instances as a single ``bytes`` object.
+    Every distinct string is stored only once within a batch, so values
+    such as bucket names and credentials that are shared by many URIs
+    contribute little to the size of the result.
+
+    >>> data = dumps([b3u('s3://abc:xyz@bucket/a.data'), b3u('s3://abc:xyz@bucket/b.data')])
+    >>> [b.to_string() for b in loads(data)]
+    ['s3://abc:xyz@bucket/a.data', 's3://abc:xyz@bucket/b.data']
+
+    :param objects: Instances to encode
+    :return: Encoded instances
+    """
+    (strings, references) = ({}, array('I'))
+
+    def reference(value) -> int:
+        if value is None:
+            return 0
+        if not isinstance(value, str):
+            raise TypeError('only string values can be encoded: ' + repr(value))
+        return strings.setdefault(value, len(strings) + 1)
+
+    for instance in objects:
+        (fields, custom) = instance._state()  # pylint: disable=protected-access
+        references.extend(map(reference, fields))
+        references.append(len(custom))
+        for (name, value) in custom:
+            references.append(reference(name))
+            references.append(reference(value))
+
+    # References are stored using the narrowest sufficient integer type.
+    largest = max(references, default=0)
+    code = 'B' if largest < 1 << 8 else 'H' if largest < 1 << 16 else 'I'
+    references = array(code, references)
+
+    lengths = array('I', map(len, strings))
+    blob = ''.join(strings).encode('utf-8', 'surrogatepass')
+    return b''.join([
+        _HEADER.pack(MAGIC, code.encode(), len(strings), len(references), len(blob)),
+        _little_endian(lengths).tobytes(),
+        _little_endian(references).tobytes(),
+        blob
+    ])
+
+
+def loads(data: bytes, cls: type = b3u, frozen: bool = False) -> list:
+    """
+    Decode instances encoded using :obj:`dumps`.
+
+    >>> from b3u.compact import compact
+    >>> [c] = loads(dumps([b3u('ssm://abc:xyz@/path/to/parameter?tier=cold')]), compact)
+    >>> c.for_get()
+    {'Name': '/path/to/parameter'}
+    >>> c.tier
+    'cold'
+    >>> loads(b'B3U0')
+    Traceback (most recent call last):
+      ...
+    ValueError: data is not in a supported format
+
+    :param data: Encoded instances
+    :param cls: Class of the instances to create (either :obj:`b3u` or
+        :obj:`b3u.compact.compact`)
+    :param frozen: Whether :obj:`b3u.compact.compact` instances are frozen
+    :return: List of instances
+    """
+    data = memoryview(data)
+    if len(data) < _HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise ValueError('data is not in a supported format')
+    (_, code, count, size, length) = _HEADER.unpack_from(data)
+    if code not in (b'B', b'H', b'I'):
+        raise ValueError('data is not in a supported format')
+
+    (lengths, references) = (array('I'), array(code.decode()))
+    start = _HEADER.size
+    end = start + count * lengths.itemsize
+    lengths.frombytes(data[start:end])
+    (start, end) = (end, end + size * references.itemsize)
+    references.frombytes(data[start:end])
+    if len(data) != end + length:
+        raise ValueError('data is truncated or has trailing bytes')
+    _little_endian(lengths)
+    _little_endian(references)
+
+    # The strings are decoded together and then split at character offsets.
+    text = bytes(data[end:]).decode('utf-8', 'surrogatepass')
+    offsets = [0, *accumulate(lengths)]
+    if offsets[-1] != len(text):
+        raise ValueError('data is corrupt (string lengths do not match the string data)')
+    if len(references) > 0 and max(references) > count:
+        raise ValueError('data is corrupt (a string reference is out of range)')
+    strings = [None]
+    strings.extend(text[offsets[i]:offsets[i + 1]] for i in range(count))
+
+    if cls is b3u:
+        restore = _restore
+    else:
+        from .compact import compact, _restore as restore_compact  # pylint: disable=import-outside-toplevel
+        if cls is not compact:
+            raise TypeError('instances can only be decoded as b3u or compact objects')
+        restore = partial(restore_compact, frozen=frozen)
+
+    (instances, position, width) = ([], 0, len(_FIELDS))
+    while position < size:
+        if position + width >= size:
+            raise ValueError('data is corrupt (an instance is incomplete)')
+        fields = tuple(strings[reference] for reference in references[position:position + width])
+        pairs = references[position + width]
+        position += width + 1
+        if position + 2 * pairs > size:
+            raise ValueError('data is corrupt (an instance is incomplete)')
+        custom = tuple(
+            (strings[references[i]], strings[references[i + 1]])
+            for i in range(position, position + 2 * pairs, 2)
+        )
+        position += 2 * pairs
+        instances.append(restore(fields, custom))
+
+    return instances
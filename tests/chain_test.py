@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from b3u import b3u
+from b3u.chain import credential_chain
+from b3u.compact import compact
+
+CREDENTIALS = '''[default]
+aws_access_key_id = DEFAULT_ID
+aws_secret_access_key = DEFAULT_SECRET
+
+[dev]
+aws_access_key_id = DEV_ID
+aws_secret_access_key = DEV_SECRET
+aws_session_token = DEV_TOKEN_1
+'''
+
+CONFIG = '''[default]
+region = us-east-1
+
+[profile dev]
+region = eu-west-1
+
+[profile ops]
+aws_access_key_id = OPS_ID
+aws_secret_access_key = OPS_SECRET
+'''
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = (str(tmp_path / 'credentials'), str(tmp_path / 'config'))
+    for (path, text) in zip(paths, [CREDENTIALS, CONFIG]):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+    return {'AWS_SHARED_CREDENTIALS_FILE': paths[0], 'AWS_CONFIG_FILE': paths[1]}
+
+
+def _rewrite(path, old, new, mtime=None):
+    status = os.stat(path)
+    with open(path, encoding='utf-8') as file:
+        text = file.read()
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text.replace(old, new))
+    os.utime(path, ns=(status.st_atime_ns, status.st_mtime_ns if mtime is None else mtime))
+
+
+def test_profiles(files):
+    chain = credential_chain(environ=files)
+    assert chain.resolve() == {
+        'aws_access_key_id': 'DEFAULT_ID', 'aws_secret_access_key': 'DEFAULT_SECRET', 'region_name': 'us-east-1'
+    }
+    assert credential_chain(profile='dev', environ=files).resolve() == {
+        'aws_access_key_id': 'DEV_ID', 'aws_secret_access_key': 'DEV_SECRET',
+        'aws_session_token': 'DEV_TOKEN_1', 'region_name': 'eu-west-1'
+    }
+    assert credential_chain(environ={**files, 'AWS_PROFILE': 'ops'}).resolve() == {
+        'aws_access_key_id': 'OPS_ID', 'aws_secret_access_key': 'OPS_SECRET'
+    }
+    assert credential_chain(profile='missing', environ=files).resolve() == {}
+    assert credential_chain(environ={}, credentials_file='/nonexistent', config_file='/nonexistent').resolve() == {}
+
+
+def test_environment(files):
+    environ = {**files, 'AWS_ACCESS_KEY_ID': 'ENV_ID', 'AWS_SECRET_ACCESS_KEY': 'ENV_SECRET'}
+    chain = credential_chain(profile='dev', environ=environ)
+    assert chain.resolve() == {
+        'aws_access_key_id': 'ENV_ID', 'aws_secret_access_key': 'ENV_SECRET', 'region_name': 'eu-west-1'
+    }
+
+    environ['AWS_SESSION_TOKEN'] = 'ENV_TOKEN'
+    environ['AWS_DEFAULT_REGION'] = 'us-west-1'
+    assert chain.resolve()['aws_session_token'] == 'ENV_TOKEN'
+    assert chain.resolve()['region_name'] == 'us-west-1'
+    environ['AWS_REGION'] = 'us-west-2'
+    assert chain.resolve()['region_name'] == 'us-west-2'
+
+    # An incomplete set of credentials in the environment is ignored.
+    chain = credential_chain(environ={**files, 'AWS_ACCESS_KEY_ID': 'ENV_ID'})
+    assert chain.resolve()['aws_access_key_id'] == 'DEFAULT_ID'
+
+
+def test_caching(files):
+    now = [0.0]
+    chain = credential_chain(profile='dev', environ=files, ttl=60, clock=lambda: now[0])
+    for _ in range(100):
+        chain.resolve()
+    assert chain.reads == 2
+
+    # Files are parsed again only when they change.
+    _rewrite(files['AWS_CONFIG_FILE'], 'eu-west-1', 'eu-west-2', os.stat(files['AWS_CONFIG_FILE']).st_mtime_ns + 10**9)
+    assert chain.resolve()['region_name'] == 'eu-west-2'
+    assert chain.reads == 3
+
+    # A rewrite that preserves the modification time and size is only
+    # noticed once the session token expires.
+    _rewrite(files['AWS_SHARED_CREDENTIALS_FILE'], 'DEV_TOKEN_1', 'DEV_TOKEN_2')
+    now[0] = 59.0
+    assert chain.resolve()['aws_session_token'] == 'DEV_TOKEN_1'
+    now[0] = 61.0
+    assert chain.resolve()['aws_session_token'] == 'DEV_TOKEN_2'
+    assert chain.reads == 5
+
+    # Values without a session token do not expire.
+    chain = credential_chain(environ=files, ttl=60, clock=lambda: now[0])
+    chain.resolve()
+    now[0] = 1000.0
+    chain.resolve()
+    assert chain.reads == 2
+
+    chain.clear()
+    chain.resolve()
+    assert chain.reads == 4
+
+
+def test_fallback(files):
+    chain = b3u.enable_fallback(credential_chain(environ=files))
+    try:
+        for constructor in [b3u, compact]:
+            test_object = constructor('s3://bucket/object.data')
+            assert test_object.cred() == {'aws_access_key_id': 'DEFAULT_ID', 'aws_secret_access_key': 'DEFAULT_SECRET'}
+            assert test_object.for_client() == {
+                'service_name': 's3', 'region_name': 'us-east-1',
+                'aws_access_key_id': 'DEFAULT_ID', 'aws_secret_access_key': 'DEFAULT_SECRET'
+            }
+            assert test_object.to_string() == 's3://bucket/object.data'
+            assert test_object.aws_access_key_id is None
+
+            # Credentials in a URI are never combined with others.
+            test_object = constructor('s3://:XYZ@bucket/object.data?region_name=us-west-2')
+            assert test_object.conf() == {'aws_secret_access_key': 'XYZ', 'region_name': 'us-west-2'}
+
+        result = b3u.parse_many(['s3://bucket/a', 's3://abc:xyz@bucket/b'])
+        assert result.for_client(0)['aws_access_key_id'] == 'DEFAULT_ID'
+        assert result.credentials(1) == {'aws_access_key_id': 'abc', 'aws_secret_access_key': 'xyz'}
+
+        reads = chain.reads
+        for _ in range(100):
+            b3u('s3://bucket/object.data').for_client()
+        assert chain.reads == reads
+    finally:
+        b3u.disable_fallback()
+
+    assert b3u('s3://bucket/object.data').cred() == {}
@@ -0,0 +1,51 @@
+"""
+Import-time budget for the package (as measured by ``python -X importtime``).
+The budget (in microseconds) can be overridden using the environment
+variable ``B3U_IMPORT_TIME_BUDGET``.
+"""
+import os
+import sys
+import subprocess
+
+# Modules that importing the package may load (beyond those loaded at startup).
+ALLOWED = {'b3u', 'b3u.b3u', '__future__', 'itertools'}
+
+BUDGET = int(os.environ.get('B3U_IMPORT_TIME_BUDGET', '5000'))
+
+
+def _profile(env: dict) -> tuple:
+    """
+    Import the package in a fresh interpreter, returning its cumulative import
+    time (in microseconds) and the names of all modules imported along with it.
+    """
+    lines = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import b3u'],
+        env=env, capture_output=True, text=True, check=True
+    ).stderr.splitlines()
+
+    entries = []
+    for line in lines:
+        if line.startswith('import time:') and '|' in line and 'self [us]' not in line:
+            (_, cumulative, name) = line[len('import time:'):].split('|')
+            entries.append((int(cumulative), name[1:]))
+
+    # Each module is listed after the modules that it imports (indented further).
+    index = max(i for (i, (_, name)) in enumerate(entries) if name == 'b3u')
+    modules = {'b3u'}
+    for (_, name) in reversed(entries[:index]):
+        if not name.startswith(' '):
+            break
+        modules.add(name.strip())
+
+    return (entries[index][0], modules)
+
+
+def test_import_time(tmp_path):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPYCACHEPREFIX'] = str(tmp_path)  # Keep compiled files out of the tree.
+    _profile(env)  # Compile the modules so that compilation is not measured.
+
+    profiles = [_profile(env) for _ in range(5)]
+    assert profiles[0][1] <= ALLOWED, 'unexpected imports: ' + ', '.join(sorted(profiles[0][1] - ALLOWED))
+    assert min(time for (time, _) in profiles) <= BUDGET
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from b3u import b3u
+from b3u.index import prefix_index
+
+
+def _brute_common_prefixes(keys, depth, prefix):
+    result = set()
+    for key in keys:
+        if key.startswith(prefix):
+            segments = key.split('/')
+            if len(segments) > depth:
+                result.add('/'.join(segments[:depth]) + '/')
+    return sorted(result)
+
+
+def _check_cover(keys, selected, prefixes):
+    for key in selected:
+        assert any(key.startswith(p) for p in prefixes)
+    for p in prefixes:
+        covered = [key for key in keys if key.startswith(p)]
+        assert set(covered) <= set(selected) or p in selected
+
+
+def test_randomized():
+    rng = random.Random(0)
+    index = prefix_index()
+    keys = set()
+
+    for _ in range(3000):
+        key = '/'.join(rng.choice(['a', 'ab', 'b', 'abc', '']) for _ in range(rng.randint(1, 4)))
+        uri = 's3://bucket/' + key
+        key = b3u(uri).Key  # Leading slashes are not part of the key.
+        if rng.random() < 0.7:
+            assert index.add(b3u(uri)) == (key not in keys)
+            keys.add(key)
+        else:
+            assert index.remove(uri) == (key in keys)
+            keys.discard(key)
+        assert len(index) == len(keys)
+
+    ordered = sorted(keys)
+    assert list(index.keys('bucket')) == ordered
+    for prefix in ['', 'a', 'ab', 'a/', 'ab/a', 'abc/', 'b/b', 'z']:
+        assert list(index.keys('bucket', prefix)) == [key for key in ordered if key.startswith(prefix)]
+        assert index.count('bucket', prefix) == len([key for key in ordered if key.startswith(prefix)])
+        for depth in range(5):
+            assert index.common_prefixes('bucket', depth, prefix) == \
+                (_brute_common_prefixes(keys, depth, prefix) if depth > 0 else [])
+
+    for _ in range(50):
+        selected = rng.sample(ordered, rng.randint(1, len(ordered)))
+        prefixes = index.cover('bucket', selected)
+        _check_cover(keys, selected, prefixes)
+        assert prefixes == sorted(prefixes)
+        assert len(prefixes) <= len(set(selected))
+
+    assert all(b3u('s3://bucket/' + key) in index for key in keys)
+    for key in list(keys):
+        assert index.remove('s3://bucket/' + key)
+    assert len(index) == 0 and index.buckets() == []
+
+
+def test_cover():
+    index = prefix_index('s3://bucket/' + key for key in ['a/x', 'a/y', 'a', 'ab', 'b/x', 'b/y/z'])
+    assert index.cover('bucket', ['a/x', 'a/y', 'b/x', 'b/y/z']) == ['a/', 'b/']
+    assert index.cover('bucket', ['a/x', 'a/y', 'a', 'ab', 'b/x', 'b/y/z']) == ['']
+    assert index.cover('bucket', ['a', 'a/x']) == ['a', 'a/x']
+    assert index.cover('bucket', ['a', 'a/x', 'a/y']) == ['a', 'a/']
+
+    with pytest.raises(KeyError):
+        index.cover('bucket', ['a/'])
+    with pytest.raises(KeyError):
+        index.cover('other', ['a'])
+
+    index = prefix_index(['s3://bucket/logs/1', 's3://bucket/logs/2', 's3://other/logs/3'])
+    assert index.cover('bucket', ['logs/1', 'logs/2']) == ['logs/']
+    assert index.buckets() == ['bucket', 'other']
+    assert index.common_prefixes('bucket', 1, 'logs/1') == ['logs/']
+    assert index.cover('bucket', []) == []
+
+
+def test_deep():
+    # Keys of up to 1024 characters (the S3 maximum) yield a trie of that depth.
+    keys = ['a' * n for n in range(1, 1025)]
+    index = prefix_index('s3://bucket/' + key for key in keys)
+    assert list(index.keys('bucket')) == keys
+    assert index.cover('bucket', keys[1:]) == keys[1:2]
+    assert index.cover('bucket', keys[:-1]) == keys[:-1]
+    assert index.common_prefixes('bucket', 1) == []
+
+    keys = ['a/' * n for n in range(1, 513)]
+    index = prefix_index('s3://bucket/' + key for key in keys)
+    assert index.common_prefixes('bucket', 512) == [keys[-1]]
+
+
+def test_errors():
+    index = prefix_index()
+    with pytest.raises(ValueError):
+        index.add('s3://bucket')
+    with pytest.raises(ValueError):
+        index.add('ssm:///parameter')
+    assert not index.remove('s3://bucket/key')
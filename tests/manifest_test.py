@@ -0,0 +1,74 @@
+import io
+import sys
+
+from b3u import b3u
+from b3u.manifest import manifest
+
+LINES = [
+    b's3://abc:xyz@bucket/a.data?region_name=us-east-1\n',
+    b'\n',
+    b's3://abc:xyz:1:2@bucket/b.data\n',
+    b'ssm://ABC:XYZ@/path/to/parameter\r\n',
+    b'\xff\xfe\n',
+    b'bucket/c.data\n',
+    b's3://bucket/d.data',
+]
+
+
+def _check(m):
+    results = list(m)
+    assert results == [
+        (1, {'Bucket': 'bucket', 'Key': 'a.data'}),
+        (4, {'Name': '/path/to/parameter'}),
+        (7, {'Bucket': 'bucket', 'Key': 'd.data'}),
+    ]
+    assert [(number, line) for (number, line, _) in m.errors] == [
+        (3, 's3://abc:xyz:1:2@bucket/b.data'), (5, '\\xff\\xfe'), (6, 'bucket/c.data')
+    ]
+
+
+def test_path(tmp_path):
+    path = tmp_path / 'manifest.txt'
+    path.write_bytes(b''.join(LINES))
+    for use_mmap in [False, True]:
+        _check(manifest(path, lambda u: b3u(u).for_get(), use_mmap=use_mmap, buffer_size=16))
+        _check(manifest(str(path), lambda u: b3u(u).for_get(), use_mmap=use_mmap))
+
+    path.write_bytes(b'')
+    assert list(manifest(path, use_mmap=True)) == []
+
+
+def test_stdin(monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(b''.join(LINES))))
+    _check(manifest('-', lambda u: b3u(u).for_get()))
+
+
+def test_file_objects():
+    _check(manifest(io.BytesIO(b''.join(LINES)), lambda u: b3u(u).for_get()))
+
+    errors = []
+    m = manifest(
+        io.StringIO('s3://abc:xyz@bucket/a.data?region_name=us-east-1\nbucket\n'),
+        on_error=lambda number, line, error: errors.append(number)
+    )
+    [(number, test_object)] = list(m)
+    assert number == 1 and test_object.for_client() == {
+        'service_name': 's3', 'region_name': 'us-east-1',
+        'aws_access_key_id': 'abc', 'aws_secret_access_key': 'xyz'
+    }
+    assert errors == [2] and m.errors == []
+
+    # Errors are recorded for the most recent iteration only.
+    source = io.StringIO('bucket\n')
+    m = manifest(source)
+    for _ in range(2):
+        source.seek(0)
+        assert list(m) == [] and len(m.errors) == 1
+
+
+def test_lazy():
+    def lines():
+        yield b's3://bucket/a\n'
+        raise AssertionError('manifest read beyond the first line')
+
+    assert next(iter(manifest(lines(), lambda u: b3u(u).for_get()))) == (1, {'Bucket': 'bucket', 'Key': 'a'})
@@ -0,0 +1,98 @@
+import pytest
+
+from b3u import b3u
+from b3u.compact import compact
+from b3u.pool import client_pool
+
+SECRETS = ['AKIDEXAMPLE', 'wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY', 'SESSIONTOKEN', 'hunter2']
+URIS = [
+    's3://AKIDEXAMPLE:wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY@bucket/object.data?region_name=us-east-1',
+    's3://AKIDEXAMPLE:secret:SESSIONTOKEN@bucket/other.data?password=hunter2',
+    'ssm://AKIDEXAMPLE:secret@/path/to/parameter?region_name=us-east-1',
+]
+
+
+@pytest.fixture
+def events():
+    events = []
+    yield (b3u.enable_metrics(lambda *event: events.append(event)), events)
+    b3u.disable_metrics()
+    b3u.disable_cache()
+
+
+def test_operations(events):
+    (metrics, events) = events
+    for uri in URIS:
+        b = b3u(uri)
+        (b.for_client(), b.for_get(), b.cred(), b.conf(False), b.to_string())
+    b3u(URIS[0], lazy=True)
+    compact(URIS[2]).for_get()
+    b3u.parse_many(URIS)
+
+    operations = metrics.snapshot()['operations']
+    assert set(operations['construct']) == {'s3', 'ssm'}
+    assert operations['construct']['s3']['count'] == 2
+    for operation in ['for_client', 'credentials', 'configuration', 'to_string']:
+        assert operations[operation]['s3']['count'] == 2
+        assert operations[operation]['ssm']['count'] == 1
+    assert operations['for_get']['ssm']['count'] == 1 + 1  # Including the compact instance.
+    assert operations['construct_lazy'][None]['count'] == 1
+    assert operations['construct_compact']['ssm']['count'] == 1
+    assert operations['parse_many'][None]['count'] == 1
+
+    for entry in operations['construct'].values():
+        assert sum(entry['histogram'].values()) == entry['count']
+        assert entry['total_ns'] < 2 * max(entry['histogram']) * entry['count']
+
+    timed = [event for event in events if event[2] is not None]
+    assert len(timed) == sum(
+        entry['count'] for services in operations.values() for entry in services.values()
+    )
+
+
+def test_hit_rates(events):
+    (metrics, _) = events
+    b3u.enable_cache()
+    for uri in URIS + URIS + URIS[:1]:
+        b3u(uri)
+
+    pool = client_pool(factory=dict)
+    for uri in URIS:
+        pool.get(uri)
+
+    # The pool also parses each URI (via the cache).
+    snapshot = metrics.snapshot()
+    assert snapshot['counters'] == {
+        'cache': {'miss': 3, 'hit': 7},
+        'pool': {'created': 3}
+    }
+    assert snapshot['hit_rates'] == {'cache': 0.7, 'pool': 0.0}
+
+    pool.get(URIS[0])
+    assert metrics.snapshot()['hit_rates']['pool'] == 0.25
+
+    metrics.reset()
+    assert metrics.snapshot() == {'operations': {}, 'counters': {}, 'hit_rates': {}}
+
+
+def test_secrets(events):
+    (metrics, events) = events
+    b3u.enable_cache()
+    pool = client_pool(factory=dict)
+    for uri in URIS:
+        b = b3u(uri)
+        (b.for_client(False), b.cred(), b.to_string(), pool.get(b))
+
+    recorded = repr(metrics.snapshot()) + repr(events)
+    for secret in SECRETS:
+        assert secret not in recorded
+
+
+def test_disabled():
+    assert b3u._metrics is None
+    events = []
+    metrics = b3u.enable_metrics(lambda *event: events.append(event))
+    b3u.disable_metrics()
+    b3u(URIS[0]).for_client()
+    assert events == []
+    assert metrics.snapshot()['operations'] == {}
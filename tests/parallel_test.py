@@ -0,0 +1,107 @@
+import random
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from b3u import b3u
+from b3u.b3u import _SERVICES
+from b3u.manifest import manifest
+from b3u.parallel import chunks, parse_file
+
+
+def _write(tmp_path, count):
+    rng = random.Random(0)
+    lines = []
+    for i in range(count):
+        choice = rng.random()
+        if choice < 0.05:
+            lines.append(b'')
+        elif choice < 0.08:
+            lines.append(b'not-a-uri/' + str(i).encode())
+        elif choice < 0.1:
+            lines.append(b's3://a:b:c:d@bucket/' + str(i).encode())
+        elif choice < 0.11:
+            lines.append(b' s3://bucket/\xff\xfe' + str(i).encode() + b'\r')
+        else:
+            lines.append((
+                's3://abc:xyz@bucket-' + str(i % 3) + '/key/' + str(i) +
+                '?region_name=us-east-' + str(i % 2 + 1) + ('&tier=cold' if i % 7 == 0 else '')
+            ).encode())
+    path = tmp_path / 'manifest.txt'
+    path.write_bytes(b'\n'.join(lines) + b'\n')
+    return path
+
+
+def test_chunks(tmp_path):
+    path = _write(tmp_path, 500)
+    data = path.read_bytes()
+    for size in [1, 7, 100, 10 ** 6]:
+        ranges = chunks(str(path), size)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        for ((_, end), (start, _)) in zip(ranges, ranges[1:]):
+            assert end == start and data[end - 1:end] == b'\n'
+
+    with pytest.raises(ValueError):
+        chunks(str(path), 0)
+
+
+def test_parse_file(tmp_path):
+    path = _write(tmp_path, 2000)
+
+    def check(uri):
+        b3u(uri)  # Raises an exception for malformed URIs.
+        return uri
+
+    reference = manifest(path, check)
+    uris = [uri for (_, uri) in reference]
+    expected = b3u.parse_many(uris)
+    expected_errors = [(number, line) for (number, line, _) in reference.errors]
+
+    for (workers, chunk_size) in [(1, 1 << 20), (2, 1000), (4, 333)]:
+        (result, errors) = parse_file(str(path), workers=workers, chunk_size=chunk_size)
+        assert vars(result) == vars(expected)
+        assert [(number, line) for (number, line, _) in errors] == expected_errors
+    assert any(line.startswith('s3://bucket/\\xff\\xfe') for (_, line) in expected_errors)
+
+    with ThreadPoolExecutor(2) as executor:
+        (result, errors) = parse_file(str(path), chunk_size=1000, executor=executor)
+    assert vars(result) == vars(expected)
+    assert result.for_client(1) == b3u(uris[1]).for_client()
+
+
+def test_registered_services(tmp_path):
+    # Workers started afresh (as on macOS and Windows) receive the registry.
+    path = tmp_path / 'manifest.txt'
+    path.write_bytes(b'lambda://Fn?region_name=us-east-1\ns3://bucket/key\n')
+    b3u.register('lambda', {'FunctionName': 'Name'}, method='get_function')
+    try:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            (result, errors) = parse_file(str(path), executor=executor)
+        assert vars(result) == vars(b3u.parse_many(['lambda://Fn?region_name=us-east-1', 's3://bucket/key']))
+        assert (result.Name, errors) == (['Fn', None], [])
+    finally:
+        _SERVICES.pop('lambda', None)
+
+    # Services that cannot be sent to workers do not prevent parsing, and the
+    # registry is not modified by workers that are threads.
+    path.write_bytes(b's3://bucket/key\n')
+    registry = dict(_SERVICES)
+    b3u.register('lambda', {'FunctionName': 'Name'}, extract=lambda host, path: (None, None, host))
+    try:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            assert parse_file(str(path), executor=executor)[0].Key == ['key']
+        del _SERVICES['s3']
+        with ThreadPoolExecutor(2) as executor:
+            assert parse_file(str(path), executor=executor)[0].Key == [None]
+        assert 's3' not in _SERVICES and 'lambda' in _SERVICES
+    finally:
+        _SERVICES.clear()
+        _SERVICES.update(registry)
+
+
+def test_empty(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    (result, errors) = parse_file(str(path), workers=1)
+    assert len(result) == 0 and errors == []
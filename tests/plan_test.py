@@ -0,0 +1,70 @@
+import pytest
+
+from b3u import b3u
+from b3u.plan import delete_batches, copy_batches
+
+
+def test_delete_batches():
+    uris = (
+        's3://abc:xyz@bucket-' + str(i % 2) + '/' + str(i) + '.data' + ('?region_name=us-east-1' if i % 3 == 0 else '')
+        for i in range(2500)
+    )
+    batches = list(delete_batches(uris, quiet=True))
+    assert all(len(request['Delete']['Objects']) <= 1000 for (_, request) in batches)
+    assert all(request['Delete']['Quiet'] for (_, request) in batches)
+
+    keys = {}
+    for (parameters, request) in batches:
+        group = (parameters.get('region_name'), request['Bucket'])
+        keys.setdefault(group, []).extend(o['Key'] for o in request['Delete']['Objects'])
+    for i in range(2500):
+        group = ('us-east-1' if i % 3 == 0 else None, 'bucket-' + str(i % 2))
+        assert str(i) + '.data' in keys[group]
+    assert sum(map(len, keys.values())) == 2500
+    assert len(batches) == 4
+
+    batches = delete_batches('s3://bucket/' + str(i) for i in range(2500))
+    assert [len(request['Delete']['Objects']) for (_, request) in batches] == [1000, 1000, 500]
+
+
+def test_delete_batches_lazy():
+    def uris():
+        for i in range(10):
+            yield 's3://bucket/' + str(i)
+        raise AssertionError('planner consumed more input than necessary')
+
+    batches = delete_batches(uris(), batch_size=5)
+    (parameters, request) = next(batches)
+    assert parameters == {'service_name': 's3'}
+    assert request == {'Bucket': 'bucket', 'Delete': {'Objects': [{'Key': str(i)} for i in range(5)]}}
+
+
+def test_errors():
+    for uri in ['ssm:///parameter', 's3://bucket', 's3://bucket/']:
+        with pytest.raises(ValueError):
+            list(delete_batches([uri]))
+
+    # Credentials are not included in the message.
+    with pytest.raises(ValueError) as info:
+        list(delete_batches(['s3://AKIA:wJalrXUtnFEMI:token@bucket/']))
+    assert 'AKIA' not in str(info.value) and 'wJalrXUtnFEMI' not in str(info.value) and 'token' not in str(info.value)
+    with pytest.raises(ValueError):
+        list(delete_batches(['s3://bucket/key'], batch_size=1001))
+    with pytest.raises(ValueError):
+        list(copy_batches([('s3://bucket/key', 's3://bucket/other')], batch_size=0))
+
+
+def test_copy_batches():
+    pairs = [
+        (b3u('s3://src/' + str(i)), 's3://abc:xyz@dst-' + str(i % 2) + '/copy/' + str(i))
+        for i in range(5)
+    ]
+    batches = list(copy_batches(pairs, batch_size=2))
+    assert [len(requests) for (_, requests) in batches] == [2, 2, 1]
+    assert batches[0] == (
+        {'service_name': 's3', 'aws_access_key_id': 'abc', 'aws_secret_access_key': 'xyz'},
+        [
+            {'Bucket': 'dst-0', 'Key': 'copy/0', 'CopySource': {'Bucket': 'src', 'Key': '0'}},
+            {'Bucket': 'dst-0', 'Key': 'copy/2', 'CopySource': {'Bucket': 'src', 'Key': '2'}},
+        ]
+    )
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from b3u import b3u
+from b3u.pool import client_pool
+
+
+class stub:
+    def __init__(self, **parameters):
+        self.parameters = parameters
+
+
+def test_reuse():
+    pool = client_pool(factory=stub)
+    a = pool.get('s3://abc:xyz@bucket/a.data?region_name=us-east-1&other_param=1')
+    b = pool.get(b3u('s3://abc:xyz@other/b.data?region_name=us-east-1'))
+    c = pool.get({'region_name': 'us-east-1', 'aws_secret_access_key': 'xyz',
+                  'aws_access_key_id': 'abc', 'service_name': 's3'})
+    assert a is b is c
+    assert a.parameters == {'service_name': 's3', 'region_name': 'us-east-1',
+                            'aws_access_key_id': 'abc', 'aws_secret_access_key': 'xyz'}
+
+    assert pool.get('s3://abc:xyz:123@bucket/a.data?region_name=us-east-1') is not a
+    assert pool.get('ssm://abc:xyz@/parameter?region_name=us-east-1') is not a
+    assert pool.info() == {'created': 3, 'reused': 2, 'evicted': 0, 'expired': 0, 'size': 3}
+
+    pool.clear()
+    assert pool.get('s3://abc:xyz@bucket/a.data?region_name=us-east-1') is not a
+
+    with pytest.raises(ValueError):
+        client_pool(maxsize=0)
+
+
+def test_eviction_and_expiry():
+    now = [0.0]
+    pool = client_pool(factory=stub, maxsize=2, idle=10, clock=lambda: now[0])
+    a = pool.get('s3://bucket?region_name=a')
+    pool.get('s3://bucket?region_name=b')
+    assert pool.get('s3://bucket?region_name=a') is a
+    pool.get('s3://bucket?region_name=c')  # Evicts 'b'.
+    assert pool.info()['evicted'] == 1
+    assert pool.get('s3://bucket?region_name=a') is a
+
+    now[0] = 5.0
+    pool.get('s3://bucket?region_name=c')
+    now[0] = 12.0
+    assert pool.get('s3://bucket?region_name=a') is not a  # Expired.
+    assert pool.get('s3://bucket?region_name=c') is not None
+    now[0] = 30.0
+    pool.get('s3://bucket?region_name=d')  # Expires the remaining entries.
+    assert pool.info() == {'created': 5, 'reused': 4, 'evicted': 1, 'expired': 3, 'size': 1}
+
+
+def test_threads():
+    def factory(**parameters):
+        time.sleep(0.01)
+        return stub(**parameters)
+
+    pool = client_pool(factory=factory)
+    clients = []
+
+    def work():
+        for i in range(20):
+            clients.append(pool.get('s3://bucket/key?region_name=region-' + str(i % 4)))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, clients))) == 4
+    assert pool.info()['created'] == 4 and pool.info()['reused'] == 8 * 20 - 4
+
+
+def test_factory_failure():
+    failures = [1]
+
+    def factory(**parameters):
+        if failures[0] > 0:
+            failures[0] -= 1
+            raise RuntimeError('unavailable')
+        return stub(**parameters)
+
+    pool = client_pool(factory=factory)
+    with pytest.raises(RuntimeError):
+        pool.get('s3://bucket?region_name=a')
+    assert pool._creating == {}  # pylint: disable=protected-access
+    assert pool.get('s3://bucket?region_name=a') is pool.get('s3://bucket?region_name=a')
+    assert pool.info() == {'created': 1, 'reused': 1, 'evicted': 0, 'expired': 0, 'size': 1}
+
+
+def test_creation_window():
+    class hooked:
+        # Lock that invokes a function each time it is released.
+        def __init__(self, hook):
+            self.lock = threading.Lock()
+            self.hook = hook
+
+        def __enter__(self):
+            self.lock.acquire()
+
+        def __exit__(self, *exception):
+            self.lock.release()
+            self.hook()
+
+    created = []
+    others = []
+
+    def factory(**parameters):
+        created.append(stub(**parameters))
+        return created[-1]
+
+    def hook():
+        # Once the first client exists, request it again from another thread
+        # at every point at which the pool lock is released.
+        if len(created) == 1 and len(others) == 0:
+            others.append(None)
+            thread = threading.Thread(target=lambda: others.append(pool.get('s3://bucket?region_name=a')))
+            thread.start()
+            thread.join()
+
+    pool = client_pool(factory=factory)
+    pool._lock = hooked(hook)  # pylint: disable=protected-access
+    client = pool.get('s3://bucket?region_name=a')
+    assert others == [None, client] and created == [client]
+    assert pool.info() == {'created': 1, 'reused': 1, 'evicted': 0, 'expired': 0, 'size': 1}
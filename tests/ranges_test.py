@@ -0,0 +1,86 @@
+import io
+import os
+import random
+import threading
+
+import pytest
+
+from b3u import b3u
+from b3u.ranges import byte_range, plan, download
+
+
+class stub:
+    """
+    In-process stand-in for an S3 client that serves ranges of a single object.
+    """
+    def __init__(self, data, short=False):
+        self.data = data
+        self.short = short
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self.data)}
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):
+        with self.lock:
+            self.requests.append(Range)
+        (start, end) = map(int, Range[len('bytes='):].split('-'))
+        return {'Body': io.BytesIO(self.data[start:end + (0 if self.short else 1)])}
+
+
+def test_byte_range():
+    assert byte_range('s3://bucket/key?range=bytes=5-9') == (5, 9)
+    assert byte_range('s3://bucket/key?region_name=us-east-1#bytes=5-') == (5, None)
+    assert byte_range('s3://bucket/key#-5') == (None, 5)
+    assert byte_range(b3u('s3://bucket/key?range=0-0')) == (0, 0)
+    assert byte_range('s3://bucket/key#') is None
+
+    for expression in ['5', '-', 'bytes=9-5', 'items=0-5', '0-5,7-9', 'a-b', '+1-2', '1--2', ' 1-2', '¹-2']:
+        with pytest.raises(ValueError):
+            byte_range('s3://bucket/key#' + expression)
+
+
+def test_plan():
+    assert plan('s3://bucket/key', 0) == []
+    assert plan('s3://bucket/key', 10, 4, if_match='"etag"') == [
+        {'Bucket': 'bucket', 'Key': 'key', 'IfMatch': '"etag"', 'Range': 'bytes=' + r}
+        for r in ['0-3', '4-7', '8-9']
+    ]
+
+    ranges = [ps['Range'] for ps in plan('s3://bucket/key?range=bytes=5-', 20, 8)]
+    assert ranges == ['bytes=5-7', 'bytes=8-15', 'bytes=16-19']
+    ranges = [ps['Range'] for ps in plan('s3://bucket/key#bytes=-30', 20, 8)]
+    assert ranges == ['bytes=0-7', 'bytes=8-15', 'bytes=16-19']
+    ranges = [ps['Range'] for ps in plan('s3://bucket/key#bytes=3-100', 20, 100)]
+    assert ranges == ['bytes=3-19']
+
+    with pytest.raises(ValueError):
+        plan('s3://bucket/key#20-', 20)
+    with pytest.raises(ValueError):
+        plan('s3://bucket/key', 20, 0)
+    with pytest.raises(ValueError):
+        plan('ssm:///parameter', 20)
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_download(tmp_path, use_mmap):
+    data = bytes(random.Random(0).getrandbits(8) for _ in range(100000))
+    path = str(tmp_path / 'object.data')
+
+    client = stub(data)
+    assert download('s3://bucket/key', path, part_size=7000, client=client, use_mmap=use_mmap) == len(data)
+    with open(path, 'rb') as file:
+        assert file.read() == data
+    assert len(client.requests) == 15
+
+    assert download('s3://bucket/key#12345-67890', path, size=len(data), part_size=4096,
+                    client=stub(data), workers=3, use_mmap=use_mmap) == 67890 - 12345 + 1
+    with open(path, 'rb') as file:
+        assert file.read() == data[12345:67891]
+
+    assert download('s3://bucket/key', path, size=0, client=stub(b'')) == 0
+    assert os.path.getsize(path) == 0
+
+    with pytest.raises(IOError):
+        download('s3://bucket/key', path, part_size=7000, client=stub(data, short=True), use_mmap=use_mmap)
@@ -0,0 +1,114 @@
+import pytest
+
+from b3u import b3u
+from b3u.wildcard import wildcard
+
+KEYS = sorted([
+    'logs/2025-12/part-0.parquet',
+    'logs/2026-01/part-0.parquet',
+    'logs/2026-01/part-1.parquet',
+    'logs/2026-01/part-1.json',
+    'logs/2026-01/nested/part-2.parquet',
+    'logs/2026-02/part-0.parquet',
+    'logs/2026-02/_SUCCESS',
+    'logs/2026-*/literal.txt',
+    'data/x.csv',
+    'data/y.csv',
+    'data/z/w.csv',
+])
+
+
+class stub:
+    """
+    In-process stand-in for the ``ListObjectsV2`` operation of an S3 client.
+    """
+    def __init__(self, keys=KEYS):
+        self.keys = keys
+        self.requests = []
+        self.listed = 0
+
+    def list_objects_v2(self, Bucket, Prefix='', Delimiter=None, MaxKeys=1000, ContinuationToken=None):
+        self.requests.append({'Bucket': Bucket, 'Prefix': Prefix, 'Delimiter': Delimiter})
+        start = 0 if ContinuationToken is None else int(ContinuationToken)
+
+        candidates = [k for k in self.keys if k.startswith(Prefix)]
+        if Delimiter is not None:
+            candidates = [k for k in candidates if Delimiter not in k[len(Prefix):]]
+        page = candidates[start:start + MaxKeys]
+        self.listed += len(page)
+
+        response = {'Contents': [{'Key': k} for k in page], 'IsTruncated': start + MaxKeys < len(candidates)}
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + MaxKeys)
+        return response
+
+
+def _expected(pattern):
+    w = wildcard('s3://bucket/' + pattern)
+    return [k for k in KEYS if w.matches(k)]
+
+
+def test_matches():
+    cases = {
+        'logs/2026-*/part-*.parquet': [
+            'logs/2026-01/part-0.parquet', 'logs/2026-01/part-1.parquet', 'logs/2026-02/part-0.parquet'
+        ],
+        'logs/**/part-[!0].parquet': ['logs/2026-01/nested/part-2.parquet', 'logs/2026-01/part-1.parquet'],
+        'logs/**.json': ['logs/2026-01/part-1.json'],
+        'logs/2026-[*]/literal.txt': ['logs/2026-*/literal.txt'],
+        'data/*.csv': ['data/x.csv', 'data/y.csv'],
+        'data/[xz]*': ['data/x.csv'],
+        'data/x.csv': ['data/x.csv'],
+        '**': KEYS,
+    }
+    for (pattern, keys) in cases.items():
+        assert _expected(pattern) == sorted(keys), pattern
+
+
+def test_plan():
+    assert wildcard('s3://bucket/logs/2026-*/part-*.parquet').plan() == {'Bucket': 'bucket', 'Prefix': 'logs/2026-'}
+    assert wildcard('s3://bucket/data/*.csv').plan() == {'Bucket': 'bucket', 'Prefix': 'data/', 'Delimiter': '/'}
+    assert wildcard('s3://bucket/data/**.csv').plan() == {'Bucket': 'bucket', 'Prefix': 'data/'}
+    assert wildcard('s3://bucket/data/x.csv').plan() == {'Bucket': 'bucket', 'Prefix': 'data/x.csv'}
+    assert wildcard('s3://bucket').plan() == {'Bucket': 'bucket', 'Prefix': ''}
+
+    # Bracket expressions (such as the range from "+" to "0") may match "/".
+    w = wildcard('s3://bucket/logs/a[+-0]b')
+    assert w.matches('logs/a/b') and w.plan() == {'Bucket': 'bucket', 'Prefix': 'logs/a'}
+    assert list(w.keys(stub(['logs/a/b', 'logs/a-b', 'logs/a/c']))) == ['logs/a/b', 'logs/a-b']
+
+    for uri in ['ssm:///parameter/*', 's3:///key*', 's3://bucket/[z-a]*', 's3://bucket/logs/[!9-0]']:
+        with pytest.raises(ValueError):
+            wildcard(uri)
+
+    # Credentials are not included in the message.
+    with pytest.raises(ValueError) as info:
+        wildcard('ssm://AKIA:wJalrXUtnFEMI@/parameter/*')
+    assert 'AKIA' not in str(info.value) and 'wJalrXUtnFEMI' not in str(info.value)
+
+
+def test_keys():
+    for pattern in ['logs/2026-*/part-*.parquet', 'logs/**/part-[!0].parquet', 'data/*.csv', 'data/z/*', '**']:
+        for page_size in [None, 1, 2]:
+            client = stub()
+            assert list(wildcard('s3://bucket/' + pattern).keys(client, page_size)) == _expected(pattern)
+            assert all(r['Bucket'] == 'bucket' for r in client.requests)
+
+    # Only the keys under the literal prefix (and at the level of the pattern) are listed.
+    client = stub()
+    list(wildcard('s3://bucket/data/*.csv').keys(client, 1))
+    assert (client.listed, len(client.requests)) == (2, 2)
+
+    # Matches are produced as each page arrives.
+    client = stub()
+    keys = wildcard('s3://bucket/**').keys(client, 2)
+    assert next(keys) == KEYS[0]
+    assert len(client.requests) == 1
+
+
+def test_uris():
+    w = wildcard(b3u('s3://abc:xyz@bucket/data/*.csv?region_name=us-east-1'))
+    assert [u.to_string() for u in w.uris(stub())] == [
+        's3://abc:xyz@bucket/data/x.csv?region_name=us-east-1',
+        's3://abc:xyz@bucket/data/y.csv?region_name=us-east-1'
+    ]